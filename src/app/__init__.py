@@ -1,20 +1,119 @@
 """
 Subscription Management API Application Factory.
 """
-import importlib
+import atexit
+import functools
+import html
 import os
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, render_template_string, request
+from flask import Flask, current_app, jsonify, make_response, request
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from flask_restx import Api
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+# Load .env once per process, before the config classes read the environment
+load_dotenv()
 
 db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
 
+# Import models once so they're registered with SQLAlchemy; this must follow
+# the db definition above because the model modules import it from here
+from app.models import SubscriptionPlan, TokenBlacklist, User, UserSubscription  # noqa: E402,F401
+
+# Health probes poll frequently; reuse a database check for this many seconds
+HEALTH_CHECK_TTL = 1.0
+_HEALTH_CHECK_STMT = text('SELECT 1')
+
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """
+    Check if a token is revoked when the blacklist is enabled.
+    """
+    if not current_app.config.get('JWT_BLACKLIST_ENABLED'):
+        return False
+    return TokenBlacklist.is_token_revoked(
+        jwt_payload["jti"],
+        not_revoked_ttl=current_app.config.get('JWT_NOT_REVOKED_CACHE_TTL', 0)
+    )
+
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    """
+    Return a response when a revoked token is used.
+    """
+    return jsonify({
+        'status': 401,
+        'message': 'Token has been revoked'
+    }), 401
+
+
+@functools.lru_cache(maxsize=1)
+def _get_debug_toolbar():
+    """
+    Import the debug toolbar extension once per process.
+    
+    Returns:
+        DebugToolbarExtension class, or None if flask-debugtoolbar is not installed.
+    """
+    try:
+        from flask_debugtoolbar import DebugToolbarExtension
+    except ImportError:
+        return None
+    return DebugToolbarExtension
+
+
+@functools.lru_cache(maxsize=1)
+def _get_compress():
+    """
+    Import the response compression extension once per process.
+    
+    Returns:
+        Compress class, or None if flask-compress is not installed.
+    """
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        return None
+    return Compress
+
+
+def _queue_log_handlers(app):
+    """
+    Move the app logger's handlers onto a background thread.
+    
+    Request handlers then only enqueue their records, so a slow sink (file,
+    syslog, a remote collector) no longer adds to response latency.
+    
+    Args:
+        app: Flask application whose logger handlers are moved.
+    """
+    handlers = app.logger.handlers[:]
+    # Apps share the logger named after the package, so a later app of the
+    # same process finds the handlers already queued
+    if not handlers or any(isinstance(handler, QueueHandler) for handler in handlers):
+        return
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.listener = listener
+    for handler in handlers:
+        app.logger.removeHandler(handler)
+    app.logger.addHandler(queue_handler)
+    listener.start()
+    # Flush records still queued at interpreter exit
+    atexit.register(listener.stop)
+
+
 def create_app(config_name=None):
     """
     Application Factory Pattern implementation.
@@ -25,37 +124,25 @@ def create_app(config_name=None):
     Returns:
         Flask application instance.
     """
-    load_dotenv()
     app = Flask(__name__)
     app_config = os.getenv("FLASK_ENV", "development")
     if config_name:
         app_config = config_name
     
-    print(f"Using configuration: {app_config}")
+    app.logger.debug("Using configuration: %s", app_config)
     
-    try:
-        config_mapping = {
-            'development': ('app.config.development_config', 'DevelopmentConfig'),
-            'testing': ('app.config.testing_config', 'TestingConfig'),
-            'production': ('app.config.production_config', 'ProductionConfig')
-        }
-        
-        if app_config in config_mapping:
-            module_path, class_name = config_mapping[app_config]
-            config_module = importlib.import_module(module_path)
-            config_class = getattr(config_module, class_name)
-            app.config.from_object(config_class)
-            print(f"Loaded configuration class: {class_name}")
-        else:
-            print(f"Unknown configuration: {app_config}")
-            # Fall back to development config
-            config_module = importlib.import_module('app.config.development_config')
-            config_class = getattr(config_module, 'DevelopmentConfig')
-            app.config.from_object(config_class)
-    except Exception as e:
-        print(f"Error loading configuration: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    # Imported here rather than at module level: the config class bodies read
+    # the environment, which callers (e.g. the test suite loading .env.testing)
+    # may still adjust after importing this package
+    from app.config import config_by_name
+    
+    config_class = config_by_name.get(app_config)
+    if config_class is None:
+        app.logger.warning("Unknown configuration: %s", app_config)
+        # Fall back to development config
+        config_class = config_by_name['development']
+    app.config.from_object(config_class)
+    app.logger.debug("Loaded configuration class: %s", config_class.__name__)
     
     if 'SQLALCHEMY_DATABASE_URI' not in app.config:
         if app_config == "development":
@@ -66,40 +153,24 @@ def create_app(config_name=None):
             app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("SQLALCHEMY_DATABASE_URI", 
                                    "mysql+pymysql://user:password@db:3306/subscription_db")
     
-    print(f"DEBUG setting: {app.config.get('DEBUG')}")
-    print(f"TESTING setting: {app.config.get('TESTING')}")
-    print(f"Final Database URI: {app.config.get('SQLALCHEMY_DATABASE_URI')}")
+    app.logger.debug("DEBUG setting: %s", app.config.get('DEBUG'))
+    app.logger.debug("TESTING setting: %s", app.config.get('TESTING'))
+    app.logger.debug("Final Database URI: %s", app.config.get('SQLALCHEMY_DATABASE_URI'))
+    
+    if app.config.get('LOG_QUEUE_ENABLED'):
+        _queue_log_handlers(app)
     
     db.init_app(app)
     jwt.init_app(app)
-    
-    # Configure JWT token blacklist if enabled
-    if app.config.get('JWT_BLACKLIST_ENABLED'):
-        from app.models.token_blacklist import TokenBlacklist
-        
-        @jwt.token_in_blocklist_loader
-        def check_if_token_revoked(jwt_header, jwt_payload):
-            """
-            Check if a token is revoked.
-            """
-            jti = jwt_payload["jti"]
-            return TokenBlacklist.is_token_revoked(jti)
-            
-        @jwt.revoked_token_loader
-        def revoked_token_callback(jwt_header, jwt_payload):
-            """
-            Return a response when a revoked token is used.
-            """
-            return jsonify({
-                'status': 401,
-                'message': 'Token has been revoked'
-            }), 401
-    
     migrate.init_app(app, db)
     
-    # Import models to ensure they're registered with SQLAlchemy
-    from app.models import SubscriptionPlan, TokenBlacklist, User, UserSubscription
-
+    # Compress JSON responses for clients that accept it
+    compress = _get_compress()
+    if compress is not None:
+        compress(app)
+    else:
+        app.logger.debug("Flask-Compress not available, responses are sent uncompressed")
+    
     # Create API with additional configuration for Swagger UI documentation
     api = Api(
         app,
@@ -122,26 +193,26 @@ def create_app(config_name=None):
     from app.api.v1.auth import auth_ns as auth_ns_v1
     from app.api.v1.subscriptions import plan_ns, subscription_ns
 
-    # Import v2 namespaces
-    from app.api.v2.subscriptions import plan_ns as plan_ns_v2
-    from app.api.v2.subscriptions import subscription_ns as subscription_ns_v2
-
-    # Import v3 namespaces (optimized JOIN operations)
-    from app.api.v3.subscriptions import plan_ns as plan_ns_v3
-    from app.api.v3.subscriptions import subscription_ns as subscription_ns_v3
-
     # Register namespaces with API versioning (v1)
     api.add_namespace(auth_ns_v1, path='/api/v1/auth')
     api.add_namespace(plan_ns, path='/api/v1/plans')
     api.add_namespace(subscription_ns, path='/api/v1/subscriptions')
     
-    # Register namespaces with API versioning (v2)
-    api.add_namespace(plan_ns_v2, path='/api/v2/plans')
-    api.add_namespace(subscription_ns_v2, path='/api/v2/subscriptions')
+    # Register namespaces with API versioning (v2), imported only when enabled
+    if app.config.get('ENABLE_API_V2', True):
+        from app.api.v2.subscriptions import plan_ns as plan_ns_v2
+        from app.api.v2.subscriptions import subscription_ns as subscription_ns_v2
+
+        api.add_namespace(plan_ns_v2, path='/api/v2/plans')
+        api.add_namespace(subscription_ns_v2, path='/api/v2/subscriptions')
     
-    # Register namespaces with API versioning (v3)
-    api.add_namespace(plan_ns_v3, path='/api/v3/plans')
-    api.add_namespace(subscription_ns_v3, path='/api/v3/subscriptions')
+    # Register namespaces with API versioning (v3, optimized JOIN operations)
+    if app.config.get('ENABLE_API_V3', True):
+        from app.api.v3.subscriptions import plan_ns as plan_ns_v3
+        from app.api.v3.subscriptions import subscription_ns as subscription_ns_v3
+
+        api.add_namespace(plan_ns_v3, path='/api/v3/plans')
+        api.add_namespace(subscription_ns_v3, path='/api/v3/subscriptions')
     
     @app.route('/health')
     def health_check():
@@ -152,16 +223,26 @@ def create_app(config_name=None):
             'database_connected': _check_db_connection(app)
         })
     
+    # Last database liveness result, shared by health checks of this app
+    db_health = {'checked_at': float('-inf'), 'connected': False}
+    
     def _check_db_connection(app):
-        """Check if the database connection is working."""
+        """Check if the database connection is working, at most once per HEALTH_CHECK_TTL."""
+        now = time.monotonic()
+        if now - db_health['checked_at'] < HEALTH_CHECK_TTL:
+            return db_health['connected']
+        
         try:
-            with app.app_context():
-                # Execute a simple query
-                db.session.execute('SELECT 1')
-                return True
+            # Runs inside the health_check request, whose app context is already pushed
+            db.session.execute(_HEALTH_CHECK_STMT)
+            connected = True
         except Exception as e:
-            print(f"Database connection error: {str(e)}")
-            return False
+            app.logger.error("Database connection error: %s", e)
+            connected = False
+        
+        db_health['checked_at'] = now
+        db_health['connected'] = connected
+        return connected
     
     @app.shell_context_processor
     def shell_context():
@@ -169,8 +250,9 @@ def create_app(config_name=None):
     
     # Initialize DevToolbar extension for JSON responses
     if app_config == 'development' and app.config.get('DEBUG'):
-        # Define a simple HTML template for wrapping JSON
-        json_wrapper_template = """
+        # Define a simple HTML page for wrapping JSON, pre-encoded around
+        # the two values substituted per response (HTTP status, JSON body)
+        json_wrapper_head = b"""
         <html>
             <head>
                 <title>Debugging JSON Response</title>
@@ -182,9 +264,11 @@ def create_app(config_name=None):
             </head>
             <body>
                 <h1>JSON Response with Debug Toolbar</h1>
-                <h2>HTTP Status: {{ http_code }}</h2>
+                <h2>HTTP Status: """
+        json_wrapper_middle = b"""</h2>
                 <h2>JSON Response</h2>
-                <pre>{{ response }}</pre>
+                <pre>"""
+        json_wrapper_tail = b"""</pre>
             </body>
         </html>
         """
@@ -198,13 +282,15 @@ def create_app(config_name=None):
             if (response.mimetype == "application/json" and 
                 request.args.get('_debug') == 'true'):
                 
-                # Create HTML response wrapping the JSON
+                # Create HTML response wrapping the escaped JSON
                 html_wrapped_response = make_response(
-                    render_template_string(
-                        json_wrapper_template,
-                        response=response.get_data(as_text=True),
-                        http_code=response.status
-                    ),
+                    b"".join((
+                        json_wrapper_head,
+                        html.escape(response.status).encode(),
+                        json_wrapper_middle,
+                        html.escape(response.get_data(as_text=True)).encode(),
+                        json_wrapper_tail
+                    )),
                     response.status_code
                 )
                 
@@ -215,16 +301,22 @@ def create_app(config_name=None):
             return response
 
         # Now initialize the Flask-DebugToolbar
-        try:
-            from flask_debugtoolbar import DebugToolbarExtension
+        debug_toolbar = _get_debug_toolbar()
+        if debug_toolbar is not None:
             app.config['DEBUG_TB_ENABLED'] = True
             app.config['DEBUG_TB_INTERCEPT_REDIRECTS'] = False
             app.config['DEBUG_TB_PROFILER_ENABLED'] = True
             
             with app.app_context():
-                DebugToolbarExtension(app)
-                print("Flask-DebugToolbar initialized in development mode")
-        except ImportError:
-            print("Flask-DebugToolbar not available, skipping initialization")
+                debug_toolbar(app)
+                app.logger.debug("Flask-DebugToolbar initialized in development mode")
+        else:
+            app.logger.debug("Flask-DebugToolbar not available, skipping initialization")
+        
+        # Fail lazy loads repeated across the rows of one query (N+1 queries)
+        if app.config.get('N_PLUS_ONE_RAISE'):
+            from app.utils.n_plus_one import install_n_plus_one_guard
+            install_n_plus_one_guard()
+            app.logger.debug("N+1 lazy load guard installed in development mode")
     
     return app 
\ No newline at end of file
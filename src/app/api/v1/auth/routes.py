@@ -1,7 +1,9 @@
 """
 Authentication routes for API v1.
 """
-from datetime import datetime
+import re
+import threading
+from datetime import UTC, datetime
 
 from flask import current_app, request
 from flask_jwt_extended import (
@@ -20,6 +22,33 @@ from app.models.user import User
 
 from . import auth_ns
 
+# Required request fields, checked with a single subset test
+REGISTER_REQUIRED_FIELDS = frozenset(('username', 'email', 'password'))
+LOGIN_REQUIRED_FIELDS = frozenset(('username', 'password'))
+# Basic email shape: one '@' and a dotted domain, no whitespace
+is_valid_email = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$').match
+USERNAME_MAX_LENGTH = User.__table__.c.username.type.length
+EMAIL_MAX_LENGTH = User.__table__.c.email.type.length
+
+# Expired blacklist entries are purged opportunistically once every
+# PURGE_EVERY_N_LOGOUTS logouts handled by this process
+PURGE_EVERY_N_LOGOUTS = 256
+_logout_counter = 0
+_logout_counter_lock = threading.Lock()
+
+
+def _should_purge_blacklist():
+    """
+    Count a logout and tell whether it is this process's turn to purge.
+    
+    Returns:
+        bool: True once every PURGE_EVERY_N_LOGOUTS calls
+    """
+    global _logout_counter
+    with _logout_counter_lock:
+        _logout_counter += 1
+        return _logout_counter % PURGE_EVERY_N_LOGOUTS == 0
+
 register_model = auth_ns.model('UserRegistration', {
     'username': fields.String(required=True, description='User username'),
     'email': fields.String(required=True, description='User email address'),
@@ -70,14 +99,22 @@ class UserRegistration(Resource):
         """
         Register a new user.
         """
-        data = request.json
+        data = request.get_json(silent=True) or {}
         
         # Validate required fields
-        if not all(k in data for k in ('username', 'email', 'password')):
+        if not REGISTER_REQUIRED_FIELDS.issubset(data):
             return {'message': 'Missing required fields'}, 400
+        
+        # Validate field types and lengths; duplicates are skipped by an
+        # INSERT IGNORE, which would otherwise truncate over-long values
+        if not all(isinstance(data[field], str) for field in REGISTER_REQUIRED_FIELDS):
+            return {'message': 'Fields must be strings'}, 400
+        if (len(data['username']) > USERNAME_MAX_LENGTH or
+                len(data['email']) > EMAIL_MAX_LENGTH):
+            return {'message': 'Username or email is too long'}, 400
             
         # Validate email format (basic validation)
-        if '@' not in data['email']:
+        if not is_valid_email(data['email']):
             return {'message': 'Invalid email format'}, 400
             
         # Validate password strength (basic validation)
@@ -85,13 +122,13 @@ class UserRegistration(Resource):
             return {'message': 'Password must be at least 6 characters long'}, 400
             
         try:
-            user = User(
+            user = User.create_unless_exists(
                 username=data['username'],
                 email=data['email'],
                 password=data['password']
             )
-            db.session.add(user)
-            db.session.commit()
+            if user is None:
+                return {'message': 'Username or email already exists'}, 409
             return {
                 'id': user.id,
                 'username': user.username,
@@ -121,28 +158,41 @@ class UserLogin(Resource):
         """
         Authenticate a user and generate JWT tokens.
         """
-        data = request.json
-        if not all(k in data for k in ('username', 'password')):
+        data = request.get_json(silent=True) or {}
+        if not LOGIN_REQUIRED_FIELDS.issubset(data):
             return {'message': 'Missing required fields'}, 400
+        
+        # Only strings can match a stored username or email
+        if not isinstance(data['username'], str):
+            return {'message': 'Invalid username/email or password'}, 401
             
-        user = User.query.filter(
-            (User.username == data['username']) | (User.email == data['username'])
-        ).first()
+        # Look up by username first, then by email; separate equality lookups
+        # each use their unique index instead of an OR across two columns
+        user = User.query.filter_by(username=data['username']).first()
+        if user is None and '@' in data['username']:
+            # Registration requires '@' in emails, so only such input can match one
+            user = User.query.filter_by(email=data['username']).first()
         
         if not user or not user.check_password(data['password']):
             return {'message': 'Invalid username/email or password'}, 401
+        
+        # Upgrade legacy or outdated hashes while the plain password is at hand
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
             
-        # Generate access and refresh tokens
-        # Use custom claims to include admin status
+        # Generate access and refresh tokens from the same identity and
+        # custom claims (admin status), built once for both
+        identity = str(user.id)
         additional_claims = {"is_admin": user.is_admin}
         
         access_token = create_access_token(
-            identity=str(user.id),
+            identity=identity,
             additional_claims=additional_claims
         )
         
         refresh_token = create_refresh_token(
-            identity=str(user.id),
+            identity=identity,
             additional_claims=additional_claims
         )
         
@@ -189,20 +239,29 @@ class UserLogout(Resource):
         if not current_app.config.get('JWT_BLACKLIST_ENABLED', False):
             return {'message': 'Logout successful'}, 200
             
+        # The decoded payload already carries the identity (sub) and expiry
         token_data = get_jwt()
         jti = token_data['jti']
         token_type = "access"
-        user_id = get_jwt_identity()
+        user_id = int(token_data['sub'])
         
-        expires_at = datetime.fromtimestamp(token_data['exp'])
+        expires_at = datetime.fromtimestamp(token_data['exp'], UTC)
         
         try:
             TokenBlacklist.add_token_to_blacklist(
                 jti=jti,
                 token_type=token_type,
-                user_id=int(user_id),
+                user_id=user_id,
                 expires_at=expires_at
             )
-            return {'message': 'Successfully logged out'}, 200
         except Exception as e:
-            return {'message': f'Error during logout: {str(e)}'}, 500 
\ No newline at end of file
+            return {'message': f'Error during logout: {str(e)}'}, 500
+        
+        # The token is already revoked; a failed purge is retried on a later logout
+        if _should_purge_blacklist():
+            try:
+                TokenBlacklist.purge_expired_tokens()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error("Error purging expired blacklist entries: %s", e)
+        return {'message': 'Successfully logged out'}, 200 
\ No newline at end of file
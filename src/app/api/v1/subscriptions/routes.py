@@ -2,11 +2,17 @@
 Routes for subscription plans and user subscriptions (V1 API).
 """
 import json
+import re
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 
 from flask import current_app, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from flask_restx import Resource, fields
+from flask_jwt_extended import jwt_required
+from flask_restx import Resource, abort, fields
+from flask_restx.representations import output_json
+from sqlalchemy import and_, func, insert, lambda_stmt, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
 
 from app import db
 from app.models.subscription_plan import (
@@ -20,15 +26,46 @@ from app.models.user_subscription import (
     SubscriptionStatus,
     UserSubscription,
 )
-from app.utils.auth import admin_required
+from app.utils.auth import admin_required, get_current_user_id
+from app.utils.json_helpers import compile_serializer
+from app.utils.plan_cache import (
+    get_cached_plan_payload,
+    invalidate_plan_cache,
+    set_cached_plan_payload,
+)
+from app.utils.subscription_cache import (
+    get_cached_active_subscription,
+    invalidate_active_subscription,
+    set_cached_active_subscription,
+)
 
 from . import plan_ns, subscription_ns
 
+# Enum values read by handlers on every request, looked up once at import
+_PLAN_ACTIVE = PlanStatus.ACTIVE.value
+_SUB_ACTIVE = SubscriptionStatus.ACTIVE.value
+_SUB_CANCELED = SubscriptionStatus.CANCELED.value
+_PAY_PAID = PaymentStatus.PAID.value
+_PAY_PENDING = PaymentStatus.PENDING.value
+_INTERVAL_MONTHLY = SubscriptionInterval.MONTHLY.value
+
+# Billing period length for each plan interval; unknown intervals get 30 days
+DEFAULT_BILLING_PERIOD = timedelta(days=30)
+BILLING_PERIODS = {
+    SubscriptionInterval.MONTHLY.value: DEFAULT_BILLING_PERIOD,
+    SubscriptionInterval.QUARTERLY.value: timedelta(days=90),
+    SubscriptionInterval.SEMI_ANNUAL.value: timedelta(days=182),
+    SubscriptionInterval.ANNUAL.value: timedelta(days=365),
+}
+
 
 def get_active_subscription_or_404(user_id):
     """
     Get the active subscription for a user or raise 404 error.
     
+    The plan is loaded in the same query, as the active subscription is
+    usually marshalled together with its plan details.
+    
     Args:
         user_id (int): The ID of the user to check.
         
@@ -38,35 +75,312 @@ def get_active_subscription_or_404(user_id):
     Raises:
         werkzeug.exceptions.NotFound: If no active subscription is found.
     """
-    return UserSubscription.query.filter_by(
-        user_id=user_id,
-        status=SubscriptionStatus.ACTIVE.value
-    ).first_or_404('No active subscription found')
+    # lambda_stmt caches the statement by the lambdas' code, so repeat calls
+    # skip rebuilding and compiling it and only bind the new user_id
+    stmt = lambda_stmt(lambda: select(UserSubscription).options(
+        joinedload(UserSubscription.plan)
+    ).where(UserSubscription.status == SubscriptionStatus.ACTIVE.value))
+    stmt += lambda s: s.where(UserSubscription.user_id == user_id).limit(1)
+    
+    subscription = db.session.execute(stmt).scalars().first()
+    if subscription is None:
+        abort(404, 'No active subscription found')
+    return subscription
 
 
-def find_active_subscription(user_id):
+def get_plan_change_or_404(user_id, plan_id):
     """
-    Find the active subscription for a user without raising an error if not found.
+    Get a user's active subscription and the plan to change it to, or raise 404 error.
+    
+    Both rows come from a single query. The plan is outer joined, so a
+    missing subscription and a missing plan are still told apart.
     
     Args:
-        user_id (int): The ID of the user to check.
+        user_id (int): The ID of the user changing plans.
+        plan_id (int): The ID of the plan to change to.
         
     Returns:
-        UserSubscription or None: The active subscription for the user, or None if not found.
+        tuple: The active UserSubscription and the target SubscriptionPlan,
+            with only its id and status loaded.
+        
+    Raises:
+        werkzeug.exceptions.NotFound: If the user has no active subscription
+            or the plan does not exist.
     """
-    return UserSubscription.query.filter_by(
-        user_id=user_id,
-        status=SubscriptionStatus.ACTIVE.value
+    row = db.session.execute(
+        select(UserSubscription, SubscriptionPlan).outerjoin(
+            SubscriptionPlan, SubscriptionPlan.id == plan_id
+        ).options(
+            load_only(SubscriptionPlan.id, SubscriptionPlan.status)
+        ).where(
+            UserSubscription.user_id == user_id,
+            UserSubscription.status == _SUB_ACTIVE
+        ).limit(1)
     ).first()
+    if row is None:
+        abort(404, 'No active subscription found')
+    subscription, plan = row
+    if plan is None:
+        abort(404, 'Plan not found')
+    return subscription, plan
+
+
+def ensure_plan_and_user_exist(plan_id, user_id):
+    """
+    Check a plan and a user both exist, or raise 404 error.
+    
+    Both checks run as EXISTS subqueries of a single statement, and no rows
+    are loaded.
+    
+    Args:
+        plan_id (int): The ID of the plan.
+        user_id (int): The ID of the user.
+        
+    Raises:
+        werkzeug.exceptions.NotFound: If the plan or the user does not exist.
+    """
+    plan_found, user_found = db.session.execute(select(
+        select(SubscriptionPlan.id).where(SubscriptionPlan.id == plan_id).exists(),
+        select(User.id).where(User.id == user_id).exists()
+    )).one()
+    if not plan_found:
+        abort(404, 'Plan not found')
+    if not user_found:
+        abort(404, 'User not found')
+
+
+def update_active_subscription(subscription, **values):
+    """
+    Apply a state change to an active subscription with a single UPDATE.
+    
+    The statement only matches while the subscription is still active, so a
+    concurrent cancel or plan change is never overwritten. The loaded
+    instance is synchronized in Python instead of being flushed or reloaded.
+    
+    Args:
+        subscription (UserSubscription): The active subscription to change.
+        **values: Column values to set.
+        
+    Raises:
+        werkzeug.exceptions.NotFound: If the subscription is no longer active.
+    """
+    values.setdefault('updated_at', datetime.now(UTC))
+    result = db.session.execute(
+        update(UserSubscription).where(
+            UserSubscription.id == subscription.id,
+            UserSubscription.status == _SUB_ACTIVE
+        ).values(**values)
+    )
+    if result.rowcount == 0:
+        abort(404, 'No active subscription found')
+
+
+# Flask-Compress appends the coding to the ETag of each compressed response
+COMPRESSED_ETAG_SUFFIX_RE = re.compile(r':(?:br|gzip|deflate|zstd)"')
+
+
+def conditional_environ():
+    """
+    Get the request environ to check a response's ETag against.
+    
+    Compressed responses reach the client tagged W/"<hash>:gzip" (or :br),
+    while the view tags the uncompressed body W/"<hash>". The coding suffix
+    is dropped from If-None-Match so those clients still get 304s.
+    
+    Returns:
+        dict: The WSGI environ, with a normalized If-None-Match header.
+    """
+    if_none_match = request.environ.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match or ':' not in if_none_match:
+        return request.environ
+    return dict(request.environ, HTTP_IF_NONE_MATCH=COMPRESSED_ETAG_SUFFIX_RE.sub('"', if_none_match))
+
+
+def static_json_response(body):
+    """
+    Build a response for a pre-encoded static JSON listing.
+    
+    Skips marshalling and JSON encoding entirely, and lets clients and
+    proxies cache the listing and revalidate it against its ETag.
+    
+    Args:
+        body (bytes): The encoded JSON listing.
+        
+    Returns:
+        flask.Response: The listing response, or 304 if the client's copy is current.
+    """
+    response = current_app.response_class(body, mimetype='application/json', headers=STATIC_LISTING_HEADERS)
+    response.add_etag(weak=True)
+    return response.make_conditional(conditional_environ())
+
+
+def make_conditional_response(payload, headers=None):
+    """
+    Build a JSON response tagged with a weak ETag of its body.
+    
+    Clients that send the same ETag back in If-None-Match get an empty
+    304 Not Modified instead of the full body.
+    
+    Args:
+        payload: The already serialized response data.
+        headers (dict, optional): Extra response headers.
+        
+    Returns:
+        flask.Response: A 200 response, or 304 if the client's copy is current.
+    """
+    response = output_json(payload, 200, headers)
+    response.add_etag(weak=True)
+    return response.make_conditional(conditional_environ())
+
+
+@lru_cache(maxsize=1024)
+def parse_date_filter(value):
+    """
+    Parse an ISO format date filter, caching results by string.
+    
+    Clients tend to repeat the same boundaries (e.g. month starts) while
+    paging, and parsing is pure, so repeat values skip it.
+    
+    Args:
+        value (str): The date or datetime in ISO format.
+        
+    Returns:
+        datetime: The parsed value, or None if it is not valid ISO format.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
 
 
+def paginate_rows(stmt, page, per_page):
+    """
+    Fetch one offset page of a Core select, with the same rules as Query.paginate.
+    
+    Rows come back as-is: list endpoints serialize them straight away, so
+    building mapped instances and tracking them in the identity map is wasted work.
+    
+    Args:
+        stmt (Select): The ordered select to page through.
+        page (int): The page number, starting at 1.
+        per_page (int): The number of rows per page.
+        
+    Returns:
+        tuple: (rows, total, pages)
+        
+    Raises:
+        werkzeug.exceptions.NotFound: If page or per_page is below 1, or page
+            is past the last page.
+    """
+    if page < 1 or per_page < 1:
+        abort(404)
+    rows = db.session.execute(stmt.limit(per_page).offset((page - 1) * per_page)).all()
+    if not rows and page != 1:
+        abort(404)
+    total = db.session.execute(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    ).scalar()
+    pages = -(-total // per_page)
+    return rows, total, pages
+
+
+def build_plan_cursor(plan):
+    """
+    Build the keyset cursor pointing just after a plan in listing order.
+    
+    Args:
+        plan (SubscriptionPlan or Row): The last plan of a page.
+        
+    Returns:
+        str: The cursor, "<sort_order>_<id>".
+    """
+    return f"{plan.sort_order}_{plan.id}"
+
+
+def parse_plan_cursor(cursor):
+    """
+    Parse a keyset cursor built by build_plan_cursor.
+    
+    Args:
+        cursor (str): The cursor from the request.
+        
+    Returns:
+        tuple: (sort_order, id) of the last plan already returned.
+        
+    Raises:
+        werkzeug.exceptions.BadRequest: If the cursor is malformed.
+    """
+    sort_order_str, _, id_str = cursor.rpartition('_')
+    try:
+        return int(sort_order_str), int(id_str)
+    except ValueError:
+        abort(400, 'Invalid cursor')
+
+
+def build_history_cursor(subscription):
+    """
+    Build the keyset cursor pointing just after a subscription in history order.
+    
+    Args:
+        subscription (UserSubscription): The last subscription of a page.
+        
+    Returns:
+        str: The cursor, "<created_at ISO>_<id>".
+    """
+    return f"{subscription.created_at.isoformat()}_{subscription.id}"
+
+
+def parse_history_cursor(cursor):
+    """
+    Parse a keyset cursor built by build_history_cursor.
+    
+    Args:
+        cursor (str): The cursor from the request.
+        
+    Returns:
+        tuple: (created_at, id) of the last subscription already returned.
+        
+    Raises:
+        werkzeug.exceptions.BadRequest: If the cursor is malformed.
+    """
+    created_at_str, _, id_str = cursor.rpartition('_')
+    try:
+        return datetime.fromisoformat(created_at_str), int(id_str)
+    except ValueError:
+        abort(400, 'Invalid cursor')
+
+
+# Enum values and listing payloads, built once at import
+INTERVAL_VALUES = tuple(i.value for i in SubscriptionInterval)
+PLAN_STATUS_VALUES = tuple(s.value for s in PlanStatus)
+SUBSCRIPTION_STATUS_VALUES = tuple(s.value for s in SubscriptionStatus)
+# The listings never change at runtime, so they are encoded to JSON up front
+INTERVALS_JSON = json.dumps([{'value': i.value, 'name': i.name} for i in SubscriptionInterval]).encode()
+PLAN_STATUSES_JSON = json.dumps([{'value': s.value, 'name': s.name} for s in PlanStatus]).encode()
+# The listings only change with a deploy, so clients and proxies may reuse them
+STATIC_LISTING_HEADERS = {'Cache-Control': 'public, max-age=86400'}
+# Plans change with admin edits, which must show at once; shared caches may
+# keep plan listings but revalidate them against their ETag on every use
+PLAN_LISTING_HEADERS = {'Cache-Control': 'public, no-cache'}
+# Per-user payloads must not be shared, and are revalidated against their ETag
+PRIVATE_REVALIDATE_HEADERS = {'Cache-Control': 'private, no-cache'}
+PLAN_REQUIRED_FIELDS = frozenset(('name', 'description', 'price'))
+# Plan columns an update may set directly from the request body
+PLAN_UPDATABLE_FIELDS = frozenset((
+    'name', 'description', 'price', 'interval', 'duration_months',
+    'status', 'is_public', 'max_users', 'parent_id', 'sort_order'
+))
+# Largest history page served; bigger requests are clamped so one call
+# cannot load and serialize a user's entire history at once
+HISTORY_MAX_PER_PAGE = 100
+
 interval_model = plan_ns.model('SubscriptionInterval', {
-    'value': fields.String(description='Interval value', enum=[i.value for i in SubscriptionInterval]),
+    'value': fields.String(description='Interval value', enum=INTERVAL_VALUES),
     'name': fields.String(description='Interval display name'),
 })
 
 plan_status_model = plan_ns.model('PlanStatus', {
-    'value': fields.String(description='Status value', enum=[s.value for s in PlanStatus]),
+    'value': fields.String(description='Status value', enum=PLAN_STATUS_VALUES),
     'name': fields.String(description='Status display name'),
 })
 
@@ -74,13 +388,13 @@ plan_model = plan_ns.model('SubscriptionPlan', {
     'id': fields.Integer(description='Plan ID'),
     'name': fields.String(required=True, description='Plan name'),
     'description': fields.String(required=True, description='Plan description'),
-    'price': fields.Float(required=True, description='Plan price', attribute=lambda x: float(x.price) if hasattr(x, 'price') else None),
+    'price': fields.Float(required=True, description='Plan price'),
     'interval': fields.String(required=True, description='Billing interval', 
-                              enum=[i.value for i in SubscriptionInterval]),
+                              enum=INTERVAL_VALUES),
     'duration_months': fields.Integer(description='Duration in months', default=1),
     'features': fields.String(description='JSON string of features'),
     'status': fields.String(description='Plan status', 
-                           enum=[s.value for s in PlanStatus], 
+                           enum=PLAN_STATUS_VALUES, 
                            default=PlanStatus.ACTIVE.value),
     'is_public': fields.Boolean(description='Whether plan is publicly available', default=True),
     'max_users': fields.Integer(description='Maximum number of users allowed'),
@@ -92,10 +406,11 @@ plan_model = plan_ns.model('SubscriptionPlan', {
 
 plan_list_model = plan_ns.model('PlanList', {
     'plans': fields.List(fields.Nested(plan_model)),
-    'total': fields.Integer(description='Total number of plans'),
-    'page': fields.Integer(description='Current page number'),
+    'total': fields.Integer(description='Total number of plans (not set with cursor)'),
+    'page': fields.Integer(description='Current page number (not set with cursor)'),
     'per_page': fields.Integer(description='Items per page'),
-    'pages': fields.Integer(description='Total number of pages')
+    'pages': fields.Integer(description='Total number of pages (not set with cursor)'),
+    'next_cursor': fields.String(description='Cursor for the next page, if there is one')
 })
 
 plan_input_model = plan_ns.model('PlanInput', {
@@ -103,11 +418,11 @@ plan_input_model = plan_ns.model('PlanInput', {
     'description': fields.String(required=True, description='Plan description'),
     'price': fields.Float(required=True, description='Plan price'),
     'interval': fields.String(required=True, description='Billing interval', 
-                              enum=[i.value for i in SubscriptionInterval]),
+                              enum=INTERVAL_VALUES),
     'duration_months': fields.Integer(description='Duration in months', default=1),
     'features': fields.Raw(description='Features as JSON object'),
     'status': fields.String(description='Plan status', 
-                           enum=[s.value for s in PlanStatus], 
+                           enum=PLAN_STATUS_VALUES, 
                            default=PlanStatus.ACTIVE.value),
     'is_public': fields.Boolean(description='Whether plan is publicly available', default=True),
     'max_users': fields.Integer(description='Maximum number of users allowed'),
@@ -115,12 +430,16 @@ plan_input_model = plan_ns.model('PlanInput', {
     'sort_order': fields.Integer(description='Display order', default=0),
 })
 
+plan_bulk_result_model = plan_ns.model('PlanBulkResult', {
+    'created': fields.Integer(description='Number of plans created'),
+})
+
 subscription_model = subscription_ns.model('UserSubscription', {
     'id': fields.Integer(description='Subscription ID'),
     'user_id': fields.Integer(description='User ID'),
     'plan_id': fields.Integer(description='Plan ID'),
     'status': fields.String(description='Subscription status', 
-                           enum=[s.value for s in SubscriptionStatus]),
+                           enum=SUBSCRIPTION_STATUS_VALUES),
     'start_date': fields.DateTime(description='Start date'),
     'end_date': fields.DateTime(description='End date'),
     'trial_end_date': fields.DateTime(description='Trial end date'),
@@ -140,7 +459,7 @@ subscription_with_plan_model = subscription_ns.model('UserSubscriptionWithPlan',
     'user_id': fields.Integer(description='User ID'),
     'plan_id': fields.Integer(description='Plan ID'),
     'status': fields.String(description='Subscription status', 
-                           enum=[s.value for s in SubscriptionStatus]),
+                           enum=SUBSCRIPTION_STATUS_VALUES),
     'start_date': fields.DateTime(description='Start date'),
     'end_date': fields.DateTime(description='End date'),
     'trial_end_date': fields.DateTime(description='Trial end date'),
@@ -156,6 +475,22 @@ subscription_with_plan_model = subscription_ns.model('UserSubscriptionWithPlan',
     'plan': fields.Nested(plan_model, description='Subscription plan details')
 })
 
+subscription_history_model = subscription_ns.model('SubscriptionHistoryList', {
+    'subscriptions': fields.List(fields.Nested(subscription_with_plan_model)),
+    'total': fields.Integer(description='Total number of subscriptions (not set with cursor)'),
+    'page': fields.Integer(description='Current page number (not set with cursor)'),
+    'per_page': fields.Integer(description='Items per page'),
+    'pages': fields.Integer(description='Total number of pages (not set with cursor)'),
+    'next_cursor': fields.String(description='Cursor for the next page, if there is one')
+})
+
+# History pages and plan listings can hold many objects; serialize them
+# without marshal's per-object field reflection
+serialize_plan = compile_serializer(plan_model)
+serialize_plan_list = compile_serializer(plan_list_model)
+serialize_subscription = compile_serializer(subscription_model)
+serialize_subscription_with_plan = compile_serializer(subscription_with_plan_model)
+
 subscription_input_model = subscription_ns.model('SubscriptionInput', {
     'plan_id': fields.Integer(required=True, description='Plan ID to subscribe to'),
     'quantity': fields.Integer(description='Quantity (for seat-based plans)', default=1),
@@ -163,6 +498,16 @@ subscription_input_model = subscription_ns.model('SubscriptionInput', {
     'trial_days': fields.Integer(description='Number of trial days (if applicable)', default=0)
 })
 
+indefinite_bulk_input_model = subscription_ns.model('IndefiniteSubscriptionBulkInput', {
+    'plan_id': fields.Integer(required=True, description='Plan ID to subscribe the users to'),
+    'user_ids': fields.List(fields.Integer, required=True, description='IDs of the users to subscribe'),
+    'quantity': fields.Integer(description='Quantity (for seat-based plans)', default=1),
+})
+
+subscription_bulk_result_model = subscription_ns.model('SubscriptionBulkResult', {
+    'created': fields.Integer(description='Number of subscriptions created'),
+})
+
 plan_change_model = subscription_ns.model('PlanChangeInput', {
     'plan_id': fields.Integer(required=True, description='New plan ID to upgrade/downgrade to'),
     'prorate': fields.Boolean(description='Whether to prorate the subscription change', default=True)
@@ -180,33 +525,72 @@ class SubscriptionPlanList(Resource):
         'page': {'type': 'integer', 'default': 1, 'description': 'Page number'},
         'per_page': {'type': 'integer', 'default': 10, 'description': 'Items per page'},
         'status': {'type': 'string', 'description': 'Filter by status (active, inactive, deprecated)'},
-        'public_only': {'type': 'boolean', 'default': 'true', 'description': 'Show only public plans'}
+        'public_only': {'type': 'boolean', 'default': 'true', 'description': 'Show only public plans'},
+        'cursor': {'type': 'string', 'description': 'Continue after this next_cursor; skips page and total counts'}
     })
-    @plan_ns.marshal_with(plan_list_model)
+    @plan_ns.response(200, 'Success', plan_list_model)
+    @plan_ns.response(304, 'Not modified since the ETag in If-None-Match')
     def get(self):
         """List all subscription plans"""
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')
         public_only = request.args.get('public_only', 'true').lower() == 'true'
+        cursor = request.args.get('cursor')
+        if per_page < 1:
+            abort(400, 'per_page must be positive')
         
-        query = SubscriptionPlan.query
+        cache_key = ('v1-list', cursor or page, per_page, status, public_only)
+        cached = get_cached_plan_payload(cache_key)
+        if cached is not None:
+            return make_conditional_response(cached, PLAN_LISTING_HEADERS)
+        
+        # Core rows: the plans are only serialized, never modified
+        stmt = select(SubscriptionPlan.__table__)
         if status:
-            query = query.filter(SubscriptionPlan.status == status)
+            stmt = stmt.where(SubscriptionPlan.status == status)
         if public_only:
-            query = query.filter(SubscriptionPlan.is_public == True)
-            
-        pagination = query.order_by(SubscriptionPlan.sort_order).paginate(
-            page=page, per_page=per_page
-        )
+            stmt = stmt.where(SubscriptionPlan.is_public == True)
         
-        return {
-            'plans': pagination.items,
-            'total': pagination.total,
-            'page': pagination.page,
-            'per_page': pagination.per_page,
-            'pages': pagination.pages
-        }
+        # The id tiebreaker gives a stable order for the keyset cursor; InnoDB
+        # secondary indexes end with the primary key, so the sort_order index
+        # already covers it
+        stmt = stmt.order_by(SubscriptionPlan.sort_order, SubscriptionPlan.id)
+        
+        if cursor:
+            # Keyset pagination: seek past the previous page instead of
+            # counting and skipping rows
+            cursor_sort_order, cursor_id = parse_plan_cursor(cursor)
+            stmt = stmt.where(or_(
+                SubscriptionPlan.sort_order > cursor_sort_order,
+                and_(SubscriptionPlan.sort_order == cursor_sort_order,
+                     SubscriptionPlan.id > cursor_id)
+            ))
+            items = db.session.execute(stmt.limit(per_page + 1)).all()
+            has_next = len(items) > per_page
+            items = items[:per_page]
+            result = serialize_plan_list({
+                'plans': items,
+                'total': None,
+                'page': None,
+                'per_page': per_page,
+                'pages': None,
+                'next_cursor': build_plan_cursor(items[-1]) if has_next else None
+            })
+        else:
+            # Offset mode keeps the COUNT query: existing clients rely on total and pages
+            items, total, pages = paginate_rows(stmt, page, per_page)
+            result = serialize_plan_list({
+                'plans': items,
+                'total': total,
+                'page': page,
+                'per_page': per_page,
+                'pages': pages,
+                'next_cursor': build_plan_cursor(items[-1]) if page < pages else None
+            })
+        
+        set_cached_plan_payload(cache_key, result)
+        return make_conditional_response(result, PLAN_LISTING_HEADERS)
     
     @plan_ns.doc('create_plan')
     @plan_ns.expect(plan_input_model)
@@ -217,16 +601,15 @@ class SubscriptionPlanList(Resource):
         """Create a new subscription plan (admin only)"""
         data = request.json
         features_dict = data.pop('features', None)
-        features_json = json.dumps(features_dict) if features_dict else None
         
         plan = SubscriptionPlan(
             name=data['name'],
             description=data['description'],
             price=data['price'],
-            interval=data.get('interval', SubscriptionInterval.MONTHLY.value),
+            interval=data.get('interval', _INTERVAL_MONTHLY),
             duration_months=data.get('duration_months', 1),
-            features=features_json,
-            status=data.get('status', PlanStatus.ACTIVE.value),
+            features=features_dict or None,
+            status=data.get('status', _PLAN_ACTIVE),
             is_public=data.get('is_public', True),
             max_users=data.get('max_users'),
             parent_id=data.get('parent_id'),
@@ -235,6 +618,7 @@ class SubscriptionPlanList(Resource):
         
         db.session.add(plan)
         db.session.commit()
+        invalidate_plan_cache()
         
         return plan, 201
 
@@ -245,39 +629,46 @@ class SubscriptionPlanResource(Resource):
     """Resource for individual subscription plan operations"""
     
     @plan_ns.doc('get_plan')
-    @plan_ns.marshal_with(plan_model)
+    @plan_ns.response(200, 'Success', plan_model)
     def get(self, id):
         """Get a specific subscription plan"""
+        cache_key = ('v1-plan', id)
+        cached = get_cached_plan_payload(cache_key)
+        if cached is not None:
+            return cached
+        
         plan = SubscriptionPlan.query.get_or_404(id)
-        return plan
+        result = serialize_plan(plan)
+        set_cached_plan_payload(cache_key, result)
+        return result
     
     @plan_ns.doc('update_plan')
     @plan_ns.expect(plan_input_model)
-    @plan_ns.marshal_with(plan_model)
+    @plan_ns.response(200, 'Success', plan_model)
+    @plan_ns.response(404, 'Plan not found')
     @jwt_required()
     @admin_required()
     def put(self, id):
         """Update a subscription plan (admin only)"""
-        plan = SubscriptionPlan.query.get_or_404(id)
         data = request.json
         
-        plan.name = data.get('name', plan.name)
-        plan.description = data.get('description', plan.description)
-        plan.price = data.get('price', plan.price)
-        plan.interval = data.get('interval', plan.interval)
-        plan.duration_months = data.get('duration_months', plan.duration_months)
-        plan.status = data.get('status', plan.status)
-        plan.is_public = data.get('is_public', plan.is_public)
-        plan.max_users = data.get('max_users', plan.max_users)
-        plan.parent_id = data.get('parent_id', plan.parent_id)
-        plan.sort_order = data.get('sort_order', plan.sort_order)
-        
+        # Write only the columns sent, in one UPDATE, without loading the plan first
+        values = {key: data[key] for key in PLAN_UPDATABLE_FIELDS if key in data}
         features_dict = data.get('features')
         if features_dict is not None:
-            plan.features = json.dumps(features_dict)
+            values['features'] = SubscriptionPlan.encode_features(features_dict)
+        # Always set at least one column; the row count tells whether the plan exists
+        values['updated_at'] = func.now()
+        
+        result = db.session.execute(
+            update(SubscriptionPlan).where(SubscriptionPlan.id == id).values(**values)
+        )
+        if result.rowcount == 0:
+            abort(404, 'Plan not found')
         
         db.session.commit()
-        return plan
+        invalidate_plan_cache()
+        return serialize_plan(db.session.get(SubscriptionPlan, id))
     
     @plan_ns.doc('delete_plan')
     @plan_ns.response(204, 'Plan deleted')
@@ -288,24 +679,62 @@ class SubscriptionPlanResource(Resource):
         plan = SubscriptionPlan.query.get_or_404(id)
         db.session.delete(plan)
         db.session.commit()
+        invalidate_plan_cache()
         return '', 204
 
 
+@plan_ns.route('/bulk')
+class SubscriptionPlanBulk(Resource):
+    """Resource for creating many subscription plans at once"""
+    
+    @plan_ns.doc('create_plans_bulk')
+    @plan_ns.expect([plan_input_model])
+    @plan_ns.marshal_with(plan_bulk_result_model, code=201)
+    @plan_ns.response(400, 'Validation error')
+    @jwt_required()
+    @admin_required()
+    def post(self):
+        """Create several subscription plans in one transaction (admin only)"""
+        data = request.get_json(silent=True)
+        if not isinstance(data, list) or not data:
+            abort(400, 'A non-empty list of plans is required')
+        
+        rows = []
+        for item in data:
+            if not isinstance(item, dict) or not PLAN_REQUIRED_FIELDS.issubset(item):
+                abort(400, 'Each plan requires name, description and price')
+            features_dict = item.get('features')
+            rows.append({
+                'name': item['name'],
+                'description': item['description'],
+                'price': item['price'],
+                'interval': item.get('interval', _INTERVAL_MONTHLY),
+                'duration_months': item.get('duration_months', 1),
+                'features': SubscriptionPlan.encode_features(features_dict or None),
+                'status': item.get('status', _PLAN_ACTIVE),
+                'is_public': item.get('is_public', True),
+                'max_users': item.get('max_users'),
+                'parent_id': item.get('parent_id'),
+                'sort_order': item.get('sort_order', 0)
+            })
+        
+        # One executemany INSERT and a single commit for the whole batch
+        db.session.execute(insert(SubscriptionPlan), rows)
+        db.session.commit()
+        invalidate_plan_cache()
+        
+        return {'created': len(rows)}, 201
+
+
 @plan_ns.route('/intervals')
 class SubscriptionIntervals(Resource):
     """Resource for listing subscription intervals"""
     
     @plan_ns.doc('get_intervals')
-    @plan_ns.marshal_list_with(interval_model)
+    @plan_ns.response(200, 'Success', [interval_model])
     def get(self):
         """Get all available subscription intervals"""
-        intervals = []
-        for interval in SubscriptionInterval:
-            intervals.append({
-                'value': interval.value,
-                'name': interval.name
-            })
-        return intervals
+        return static_json_response(INTERVALS_JSON)
 
 
 @plan_ns.route('/statuses')
@@ -313,16 +742,10 @@ class PlanStatuses(Resource):
     """Resource for listing plan statuses"""
     
     @plan_ns.doc('get_plan_statuses')
-    @plan_ns.marshal_list_with(plan_status_model)
+    @plan_ns.response(200, 'Success', [plan_status_model])
     def get(self):
         """Get all available plan statuses"""
-        statuses = []
-        for status in PlanStatus:
-            statuses.append({
-                'value': status.value,
-                'name': status.name
-            })
-        return statuses
+        return static_json_response(PLAN_STATUSES_JSON)
 
 
 @subscription_ns.route('/')
@@ -337,17 +760,13 @@ class UserSubscriptionList(Resource):
     @jwt_required()
     def post(self):
         """Create a new subscription for the current user"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         data = request.json
         
         plan = SubscriptionPlan.query.get_or_404(data['plan_id'])
-        if plan.status != PlanStatus.ACTIVE.value:
+        if plan.status != _PLAN_ACTIVE:
             return {'message': 'Cannot subscribe to inactive plan'}, 400
         
-        active_subscription = find_active_subscription(user_id)
-        
-        if active_subscription:
-            return {'message': 'User already has an active subscription'}, 400
         
         now = datetime.now(UTC)
         trial_days = data.get('trial_days', 0)
@@ -357,32 +776,29 @@ class UserSubscriptionList(Resource):
             trial_end_date = now + timedelta(days=trial_days)
         
         # Calculate period end date based on the plan interval
-        period_end = now + timedelta(days=30)  # Default to 30 days
-        if plan.interval == SubscriptionInterval.ANNUAL.value:
-            period_end = now + timedelta(days=365)
-        elif plan.interval == SubscriptionInterval.SEMI_ANNUAL.value:
-            period_end = now + timedelta(days=182)
-        elif plan.interval == SubscriptionInterval.QUARTERLY.value:
-            period_end = now + timedelta(days=90)
-        elif plan.interval == SubscriptionInterval.MONTHLY.value:
-            # Already set to 30 days
-            pass
+        period_end = now + BILLING_PERIODS.get(plan.interval, DEFAULT_BILLING_PERIOD)
         
         subscription = UserSubscription(
             user_id=user_id,
             plan_id=plan.id,
-            status=SubscriptionStatus.ACTIVE.value,
+            status=_SUB_ACTIVE,
             start_date=now,
             trial_end_date=trial_end_date,
             current_period_start=now,
             current_period_end=period_end,
-            payment_status=PaymentStatus.PAID.value if not trial_days else PaymentStatus.TRIAL.value,
+            payment_status=_PAY_PAID if not trial_days else _PAY_PENDING,
             quantity=data.get('quantity', 1),
             auto_renew=data.get('auto_renew', True)
         )
         
         db.session.add(subscription)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # uq_user_subscription_active allows a single active subscription per user
+            db.session.rollback()
+            return {'message': 'User already has an active subscription'}, 400
+        invalidate_active_subscription(user_id)
         
         return subscription, 201
 
@@ -393,19 +809,17 @@ class SubscriptionUpgrade(Resource):
     
     @subscription_ns.doc('upgrade_subscription')
     @subscription_ns.expect(plan_change_model)
-    @subscription_ns.marshal_with(subscription_model)
+    @subscription_ns.response(200, 'Success', subscription_model)
     @subscription_ns.response(400, 'Invalid plan or no active subscription')
     @subscription_ns.response(404, 'Plan not found or no active subscription')
     @jwt_required()
     def post(self):
         """Upgrade or downgrade the current subscription"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         data = request.json
         
-        subscription = get_active_subscription_or_404(user_id)
-        
-        new_plan = SubscriptionPlan.query.get_or_404(data['plan_id'])
-        if new_plan.status != PlanStatus.ACTIVE.value:
+        subscription, new_plan = get_plan_change_or_404(user_id, data['plan_id'])
+        if new_plan.status != _PLAN_ACTIVE:
             return {'message': 'Cannot upgrade to inactive plan'}, 400
         
         if subscription.plan_id == new_plan.id:
@@ -421,15 +835,17 @@ class SubscriptionUpgrade(Resource):
             f"Subscription change: User {user_id} changed from plan {subscription.plan_id} to {new_plan.id}"
         )
         
-        subscription.plan_id = new_plan.id
-        
         # If downgrading, we might keep the current period end
         # If upgrading and prorating, we might adjust the period end
         
         # For this example, we'll just update the plan ID
+        update_active_subscription(subscription, plan_id=new_plan.id)
+        # Serialize before committing, which would expire the instance
+        result = serialize_subscription(subscription)
         db.session.commit()
+        invalidate_active_subscription(user_id)
         
-        return subscription
+        return result
 
 
 @subscription_ns.route('/cancel')
@@ -438,30 +854,34 @@ class SubscriptionCancel(Resource):
     
     @subscription_ns.doc('cancel_subscription')
     @subscription_ns.expect(cancel_subscription_model)
-    @subscription_ns.marshal_with(subscription_model)
+    @subscription_ns.response(200, 'Success', subscription_model)
     @subscription_ns.response(404, 'No active subscription found')
     @jwt_required()
     def post(self):
         """Cancel the current subscription"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         data = request.json
         
         subscription = get_active_subscription_or_404(user_id)
         
         now = datetime.now(UTC)
-        subscription.canceled_at = now
+        changes = {'canceled_at': now, 'updated_at': now}
         
         # If canceling immediately, update status
         at_period_end = data.get('at_period_end', True)
         if not at_period_end:
-            subscription.status = SubscriptionStatus.CANCELED.value
-            subscription.end_date = now
+            changes['status'] = _SUB_CANCELED
+            changes['end_date'] = now
         else:
-            subscription.cancel_at_period_end = True
+            changes['cancel_at_period_end'] = True
         
+        update_active_subscription(subscription, **changes)
+        # Serialize before committing, which would expire the instance
+        result = serialize_subscription(subscription)
         db.session.commit()
+        invalidate_active_subscription(user_id)
         
-        return subscription
+        return result
 
 
 @subscription_ns.route('/active')
@@ -469,16 +889,20 @@ class ActiveSubscription(Resource):
     """Resource for retrieving the active subscription"""
     
     @subscription_ns.doc('get_active_subscription')
-    @subscription_ns.marshal_with(subscription_with_plan_model)
+    @subscription_ns.response(200, 'Success', subscription_with_plan_model)
+    @subscription_ns.response(304, 'Not modified since the ETag in If-None-Match')
     @subscription_ns.response(404, 'No active subscription found')
     @jwt_required()
     def get(self):
         """Get the user's active subscription with plan details"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         
-        subscription = get_active_subscription_or_404(user_id)
+        subscription = get_cached_active_subscription(user_id, 'v1')
+        if subscription is None:
+            subscription = serialize_subscription_with_plan(get_active_subscription_or_404(user_id))
+            set_cached_active_subscription(user_id, 'v1', subscription)
         
-        return subscription
+        return make_conditional_response(subscription, PRIVATE_REVALIDATE_HEADERS)
 
 
 @subscription_ns.route('/history')
@@ -487,57 +911,77 @@ class SubscriptionHistory(Resource):
     
     @subscription_ns.doc('get_subscription_history', params={
         'page': {'type': 'integer', 'default': 1, 'description': 'Page number'},
-        'per_page': {'type': 'integer', 'default': 10, 'description': 'Items per page'},
+        'per_page': {'type': 'integer', 'default': 10, 'description': f'Items per page (at most {HISTORY_MAX_PER_PAGE})'},
         'status': {'type': 'string', 'description': 'Filter by status (comma-separated for multiple)'},
         'from_date': {'type': 'string', 'description': 'Filter subscriptions from this date (ISO format)'},
-        'to_date': {'type': 'string', 'description': 'Filter subscriptions to this date (ISO format)'}
+        'to_date': {'type': 'string', 'description': 'Filter subscriptions to this date (ISO format)'},
+        'cursor': {'type': 'string', 'description': 'Continue after this next_cursor; skips page and total counts'}
     })
-    @subscription_ns.marshal_with(subscription_ns.model('SubscriptionHistoryList', {
-        'subscriptions': fields.List(fields.Nested(subscription_with_plan_model)),
-        'total': fields.Integer(description='Total number of subscriptions'),
-        'page': fields.Integer(description='Current page number'),
-        'per_page': fields.Integer(description='Items per page'),
-        'pages': fields.Integer(description='Total number of pages')
-    }))
+    @subscription_ns.response(200, 'Success', subscription_history_model)
     @jwt_required()
     def get(self):
         """Get user's subscription history with pagination and filtering"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')
         from_date_str = request.args.get('from_date')
         to_date_str = request.args.get('to_date')
+        cursor = request.args.get('cursor')
+        if per_page < 1:
+            abort(400, 'per_page must be positive')
+        per_page = min(per_page, HISTORY_MAX_PER_PAGE)
         
-        query = UserSubscription.query.filter_by(user_id=user_id)
+        # Load each subscription's plan in the page query instead of one query per row
+        query = UserSubscription.query.options(joinedload(UserSubscription.plan)).filter_by(user_id=user_id)
         if status:
             statuses = status.split(',')
             query = query.filter(UserSubscription.status.in_(statuses))
         
-        if from_date_str:
-            try:
-                from_date = datetime.fromisoformat(from_date_str)
-                query = query.filter(UserSubscription.created_at >= from_date)
-            except ValueError:
-                pass  # Ignore invalid date format
-        
-        if to_date_str:
-            try:
-                to_date = datetime.fromisoformat(to_date_str)
-                query = query.filter(UserSubscription.created_at <= to_date)
-            except ValueError:
-                pass  # Ignore invalid date format
-        
-        query = query.order_by(UserSubscription.created_at.desc())
+        # Invalid date formats are ignored
+        from_date = parse_date_filter(from_date_str) if from_date_str else None
+        if from_date is not None:
+            query = query.filter(UserSubscription.created_at >= from_date)
+        
+        to_date = parse_date_filter(to_date_str) if to_date_str else None
+        if to_date is not None:
+            query = query.filter(UserSubscription.created_at <= to_date)
+        
+        # The id tiebreaker gives a stable order for the keyset cursor
+        query = query.order_by(UserSubscription.created_at.desc(), UserSubscription.id.desc())
+        
+        if cursor:
+            # Keyset pagination: seek past the previous page on the
+            # (user_id, created_at) index instead of counting and skipping rows
+            cursor_created_at, cursor_id = parse_history_cursor(cursor)
+            query = query.filter(or_(
+                UserSubscription.created_at < cursor_created_at,
+                and_(UserSubscription.created_at == cursor_created_at,
+                     UserSubscription.id < cursor_id)
+            ))
+            items = query.limit(per_page + 1).all()
+            has_next = len(items) > per_page
+            items = items[:per_page]
+            return {
+                'subscriptions': [serialize_subscription_with_plan(item) for item in items],
+                'total': None,
+                'page': None,
+                'per_page': per_page,
+                'pages': None,
+                'next_cursor': build_history_cursor(items[-1]) if has_next else None
+            }
+        
+        # Offset mode keeps the COUNT query: existing clients rely on total and pages
         pagination = query.paginate(page=page, per_page=per_page)
         
         return {
-            'subscriptions': pagination.items,
+            'subscriptions': [serialize_subscription_with_plan(item) for item in pagination.items],
             'total': pagination.total,
             'page': pagination.page,
             'per_page': pagination.per_page,
-            'pages': pagination.pages
+            'pages': pagination.pages,
+            'next_cursor': build_history_cursor(pagination.items[-1]) if pagination.has_next else None
         }
 
 
@@ -556,37 +1000,105 @@ class IndefiniteSubscription(Resource):
         if 'plan_id' not in data:
             return {'message': 'Plan ID is required'}, 400
         
-        admin_id = get_jwt_identity()
+        admin_id = get_current_user_id()
         target_user_id = data.get('user_id')
         
         if not target_user_id:
             return {'message': 'User ID is required'}, 400
         
-        plan = SubscriptionPlan.query.get_or_404(data['plan_id'])
-        user = User.query.get_or_404(target_user_id)
-        active_subscription = find_active_subscription(target_user_id)
-        
-        if active_subscription:
-            return {'message': 'User already has an active subscription'}, 400
+        plan_id = data['plan_id']
+        ensure_plan_and_user_exist(plan_id, target_user_id)
         
         now = datetime.now(UTC)
         subscription = UserSubscription(
             user_id=target_user_id,
-            plan_id=plan.id,
-            status=SubscriptionStatus.ACTIVE.value,
+            plan_id=plan_id,
+            status=_SUB_ACTIVE,
             start_date=now,
             trial_end_date=None,
             current_period_start=now,
             current_period_end=None,  # No period end for indefinite subscription
-            payment_status=PaymentStatus.PAID.value,
+            payment_status=_PAY_PAID,
             quantity=data.get('quantity', 1),
             auto_renew=True  # Always auto-renew for indefinite subscriptions
         )
         
         db.session.add(subscription)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # uq_user_subscription_active allows a single active subscription per user
+            db.session.rollback()
+            return {'message': 'User already has an active subscription'}, 400
+        invalidate_active_subscription(target_user_id)
+        current_app.logger.info(
+            f"Indefinite subscription created: Admin {admin_id} created subscription for user {target_user_id} to plan {plan_id}"
+        )
+        
+        return subscription, 201
+
+
+@subscription_ns.route('/indefinite/bulk')
+class IndefiniteSubscriptionBulk(Resource):
+    """Resource for creating indefinite subscriptions for many users (admin only)"""
+    
+    @subscription_ns.doc('create_indefinite_subscriptions_bulk')
+    @subscription_ns.expect(indefinite_bulk_input_model)
+    @subscription_ns.marshal_with(subscription_bulk_result_model, code=201)
+    @subscription_ns.response(400, 'Validation error or a user already has an active subscription')
+    @subscription_ns.response(404, 'Plan or user not found')
+    @jwt_required()
+    @admin_required()
+    def post(self):
+        """Create indefinite subscriptions for several users in one transaction (admin only)"""
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'plan_id' not in data:
+            abort(400, 'Plan ID is required')
+        user_ids = data.get('user_ids')
+        if (not isinstance(user_ids, list) or not user_ids
+                or not all(type(user_id) is int for user_id in user_ids)):
+            abort(400, 'A non-empty list of user IDs is required')
+        user_ids = set(user_ids)
+        
+        admin_id = get_current_user_id()
+        plan_id = data['plan_id']
+        plan_found, users_found = db.session.execute(select(
+            select(SubscriptionPlan.id).where(SubscriptionPlan.id == plan_id).exists(),
+            select(func.count(User.id)).where(User.id.in_(user_ids)).scalar_subquery()
+        )).one()
+        if not plan_found:
+            abort(404, 'Plan not found')
+        if users_found != len(user_ids):
+            abort(404, 'User not found')
+        
+        now = datetime.now(UTC)
+        quantity = data.get('quantity', 1)
+        rows = [{
+            'user_id': user_id,
+            'plan_id': plan_id,
+            'status': _SUB_ACTIVE,
+            'start_date': now,
+            'current_period_start': now,
+            'current_period_end': None,  # No period end for indefinite subscription
+            'payment_status': _PAY_PAID,
+            'quantity': quantity,
+            'auto_renew': True
+        } for user_id in user_ids]
+        
+        # One executemany INSERT and a single commit for the whole batch; the
+        # rows skip the ORM, as only their count is returned. The INSERT runs
+        # immediately, so it raises any unique index violation itself
+        try:
+            db.session.execute(insert(UserSubscription), rows)
+            db.session.commit()
+        except IntegrityError:
+            # uq_user_subscription_active allows a single active subscription per user
+            db.session.rollback()
+            abort(400, 'A user already has an active subscription')
+        for user_id in user_ids:
+            invalidate_active_subscription(user_id)
         current_app.logger.info(
-            f"Indefinite subscription created: Admin {admin_id} created subscription for user {target_user_id} to plan {plan.id}"
+            f"Indefinite subscriptions created: Admin {admin_id} subscribed {len(rows)} users to plan {plan_id}"
         )
         
-        return subscription, 201 
\ No newline at end of file
+        return {'created': len(rows)}, 201
@@ -1,14 +1,15 @@
 """
 V2 subscription routes that use optimized raw SQL queries for better performance.
 """
+import re
 from datetime import datetime
 
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import jwt_required
 from flask_restx import Resource, fields, reqparse
 
 from app.api.v2.subscriptions import plan_ns, subscription_ns
-from app.utils.auth import admin_required
-from app.utils.json_helpers import convert_decimal_in_dict
+from app.utils.auth import admin_required, get_current_user_id
+from app.utils.plan_cache import get_cached_plan_payload, set_cached_plan_payload
 from app.utils.sql_optimizations import (
     get_expiring_subscriptions,
     get_public_plans,
@@ -16,6 +17,10 @@ from app.utils.sql_optimizations import (
     get_subscription_stats,
     get_user_active_subscription,
 )
+from app.utils.subscription_cache import (
+    get_cached_active_subscription,
+    set_cached_active_subscription,
+)
 
 subscription_model = subscription_ns.model(
     "Subscription",
@@ -70,6 +75,9 @@ subscription_stats_model = subscription_ns.model(
     },
 )
 
+# History date filters are plain YYYY-MM-DD dates
+DATE_ARG_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
 # Request parsers
 subscription_history_parser = reqparse.RequestParser()
 subscription_history_parser.add_argument(
@@ -114,16 +122,35 @@ class ActiveSubscription(Resource):
     @subscription_ns.response(404, "No active subscription found")
     def get(self):
         """Get the current user's active subscription using optimized SQL"""
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
+        subscription = get_cached_active_subscription(current_user_id, "v2")
+        if subscription is not None:
+            return subscription
+
         subscription = get_user_active_subscription(current_user_id)
 
         if not subscription:
             subscription_ns.abort(404, "No active subscription found")
 
-        subscription = convert_decimal_in_dict(subscription)
+        set_cached_active_subscription(current_user_id, "v2", subscription)
         return subscription
 
 
+def parse_date_arg(args, name):
+    """Parse an optional YYYY-MM-DD query argument, aborting with 400 if malformed"""
+    value = args.get(name)
+    if not value:
+        return None
+    # Most bad input fails the shape check, so it never reaches fromisoformat;
+    # the ValueError branch only catches impossible dates such as 2024-02-30
+    if DATE_ARG_RE.match(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    subscription_ns.abort(400, f"Invalid {name} format. Use YYYY-MM-DD")
+
+
 @subscription_ns.route("/history")
 class SubscriptionHistory(Resource):
     """Get subscription history for the current user"""
@@ -133,22 +160,11 @@ class SubscriptionHistory(Resource):
     @subscription_ns.response(200, "Success")
     def get(self):
         """Get the current user's subscription history using optimized SQL"""
-        current_user_id = get_jwt_identity()
+        current_user_id = get_current_user_id()
         args = subscription_history_parser.parse_args()
 
-        from_date = None
-        to_date = None
-        if args.get("from_date"):
-            try:
-                from_date = datetime.fromisoformat(args["from_date"])
-            except ValueError:
-                subscription_ns.abort(400, "Invalid from_date format. Use YYYY-MM-DD")
-
-        if args.get("to_date"):
-            try:
-                to_date = datetime.fromisoformat(args["to_date"])
-            except ValueError:
-                subscription_ns.abort(400, "Invalid to_date format. Use YYYY-MM-DD")
+        from_date = parse_date_arg(args, "from_date")
+        to_date = parse_date_arg(args, "to_date")
 
         items, total, page, per_page, pages = get_subscription_history(
             current_user_id,
@@ -159,7 +175,6 @@ class SubscriptionHistory(Resource):
             per_page=args.get("per_page", 10),
         )
 
-        items = convert_decimal_in_dict(items)
         return {
             "subscriptions": items,
             "total": total,
@@ -184,7 +199,6 @@ class ExpiringSubscriptions(Resource):
         days = args.get("days", 7)
 
         subscriptions = get_expiring_subscriptions(days)
-        subscriptions = convert_decimal_in_dict(subscriptions)
         return {"subscriptions": subscriptions, "total": len(subscriptions)}
 
 
@@ -212,17 +226,26 @@ class PlanList(Resource):
     def get(self):
         """Get public subscription plans using optimized SQL"""
         args = plan_list_parser.parse_args()
+        status = args.get("status")
+        page = args.get("page", 1)
+        per_page = args.get("per_page", 10)
+
+        # Hits skip the SQL; plan writes in every API version clear the shared plan cache
+        cache_key = ("v2-public", status, page, per_page)
+        cached = get_cached_plan_payload(cache_key)
+        if cached is not None:
+            return cached
+
         items, total, page, per_page, pages = get_public_plans(
-            status=args.get("status"),
-            page=args.get("page", 1),
-            per_page=args.get("per_page", 10),
+            status=status, page=page, per_page=per_page
         )
 
-        items = convert_decimal_in_dict(items)
-        return {
+        result = {
             "plans": items,
             "total": total,
             "page": page,
             "per_page": per_page,
             "pages": pages,
         }
+        set_cached_plan_payload(cache_key, result)
+        return result
@@ -1,25 +1,42 @@
 """
 Routes for subscription plans and user subscriptions (V3 API) with optimized JOIN operations.
 """
-import json
 from datetime import UTC, datetime, timedelta
 
 from flask import current_app, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from flask_restx import Resource, fields
+from flask_jwt_extended import jwt_required
+from flask_restx import Resource, abort, fields
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import contains_eager, joinedload, load_only
 
 from app import db
 from app.api.v1.subscriptions.routes import (
+    INTERVALS_JSON,
+    INTERVAL_VALUES,
+    PLAN_LISTING_HEADERS,
+    PLAN_STATUSES_JSON,
+    PLAN_STATUS_VALUES,
+    PRIVATE_REVALIDATE_HEADERS,
+    SUBSCRIPTION_STATUS_VALUES,
     cancel_subscription_model,
+    get_active_subscription_or_404,
+    get_plan_change_or_404,
     interval_model,
+    make_conditional_response,
+    paginate_rows,
+    parse_date_filter,
     plan_change_model,
     plan_input_model,
     plan_list_model,
     plan_status_model,
+    serialize_plan_list,
+    serialize_subscription,
+    static_json_response,
     subscription_input_model,
     subscription_model,
     subscription_with_plan_model,
+    update_active_subscription,
 )
 from app.models.subscription_plan import (
     PlanStatus,
@@ -32,17 +49,21 @@ from app.models.user_subscription import (
     SubscriptionStatus,
     UserSubscription,
 )
-from app.utils.auth import admin_required
+from app.utils.auth import admin_required, get_current_user_id
+from app.utils.json_helpers import compile_serializer
+from app.utils.plan_cache import (
+    get_cached_plan_payload,
+    invalidate_plan_cache,
+    set_cached_plan_payload,
+)
+from app.utils.subscription_cache import (
+    get_cached_active_subscription,
+    invalidate_active_subscription,
+    set_cached_active_subscription,
+)
 
 from . import plan_ns, subscription_ns
 
-# Cache for active subscriptions (in-memory implementation)
-# In production, this would be replaced with Redis or another distributed cache
-subscription_cache = {}
-CACHE_TTL = 300  # 5 minutes in seconds
-
-# Cache for paginated plan lists
-plan_list_cache = {}
 # Cache for paginated subscription history per user
 subscription_history_cache = {}
 
@@ -50,32 +71,12 @@ PAGINATED_CACHE_TTL = 300  # 5 minutes
 
 def build_plan_list_cache_key(page, per_page, status, public_only):
     """Helper to build cache key for plans"""
-    return f"page={page}|per_page={per_page}|status={status}|public_only={public_only}"
+    return f"v3|page={page}|per_page={per_page}|status={status}|public_only={public_only}"
 
 def build_subscription_history_cache_key(user_id, page, per_page, status, from_date, to_date):
     """Helper to build cache key for subscription history"""
     return f"user={user_id}|page={page}|per_page={per_page}|status={status}|from={from_date}|to={to_date}"
 
-def get_cached_plan_list(key):
-    """Cache get/set/invalidate for plans"""
-    entry = plan_list_cache.get(key)
-    if entry and entry['expires_at'] > datetime.now(UTC).timestamp():
-        return entry['data']
-    if entry:
-        del plan_list_cache[key]
-    return None
-
-def set_cached_plan_list(key, data):
-    """Cache set for plans"""
-    plan_list_cache[key] = {
-        'data': data,
-        'expires_at': datetime.now(UTC).timestamp() + PAGINATED_CACHE_TTL
-    }
-
-def invalidate_plan_list_cache():
-    """Invalidate plan list cache"""
-    plan_list_cache.clear()
-
 def get_cached_subscription_history(key):
     """Cache get/set/invalidate for subscription history"""
     entry = subscription_history_cache.get(key)
@@ -100,37 +101,17 @@ def invalidate_subscription_history_cache(user_id=None):
         for k in keys_to_remove:
             del subscription_history_cache[k]
 
-def cache_active_subscription(user_id, subscription):
-    """Cache the active subscription for a user."""
-    subscription_cache[user_id] = {
-        'subscription': subscription,
-        'expires_at': datetime.now(UTC).timestamp() + CACHE_TTL
-    }
-
-def get_cached_active_subscription(user_id):
-    """Get the cached active subscription for a user."""
-    if user_id in subscription_cache:
-        cached = subscription_cache[user_id]
-        if cached['expires_at'] > datetime.now(UTC).timestamp():
-            return cached['subscription']
-    return None
-
-def invalidate_subscription_cache(user_id):
-    """Invalidate the subscription cache for a user."""
-    if user_id in subscription_cache:
-        del subscription_cache[user_id]
-
 plan_model = plan_ns.model('SubscriptionPlan', {
     'id': fields.Integer(description='Plan ID'),
     'name': fields.String(required=True, description='Plan name'),
     'description': fields.String(required=True, description='Plan description'),
-    'price': fields.Float(required=True, description='Plan price', attribute=lambda x: float(x.price) if hasattr(x, 'price') else None),
+    'price': fields.Float(required=True, description='Plan price'),
     'interval': fields.String(required=True, description='Billing interval', 
-                             enum=[i.value for i in SubscriptionInterval]),
+                             enum=INTERVAL_VALUES),
     'duration_months': fields.Integer(description='Duration in months', default=1),
     'features': fields.String(description='JSON string of features'),
     'status': fields.String(description='Plan status', 
-                          enum=[s.value for s in PlanStatus], 
+                          enum=PLAN_STATUS_VALUES, 
                           default=PlanStatus.ACTIVE.value),
     'is_public': fields.Boolean(description='Whether plan is publicly available', default=True),
     'max_users': fields.Integer(description='Maximum number of users allowed'),
@@ -145,7 +126,7 @@ subscription_with_plan_model = subscription_ns.model('UserSubscriptionWithPlan',
     'user_id': fields.Integer(description='User ID'),
     'plan_id': fields.Integer(description='Plan ID'),
     'status': fields.String(description='Subscription status', 
-                          enum=[s.value for s in SubscriptionStatus]),
+                          enum=SUBSCRIPTION_STATUS_VALUES),
     'start_date': fields.DateTime(description='Start date'),
     'end_date': fields.DateTime(description='End date'),
     'trial_end_date': fields.DateTime(description='Trial end date'),
@@ -161,6 +142,8 @@ subscription_with_plan_model = subscription_ns.model('UserSubscriptionWithPlan',
     'plan': fields.Nested(plan_model, description='Subscription plan details')
 })
 
+serialize_subscription_with_plan = compile_serializer(subscription_with_plan_model)
+
 @plan_ns.route('/')
 class SubscriptionPlanList(Resource):
     """Resource for listing and creating subscription plans"""
@@ -171,12 +154,10 @@ class SubscriptionPlanList(Resource):
         'status': {'type': 'string', 'description': 'Filter by status (active, inactive, deprecated)'},
         'public_only': {'type': 'boolean', 'default': 'true', 'description': 'Show only public plans'}
     })
-    @plan_ns.marshal_with(plan_list_model)
+    @plan_ns.response(200, 'Success', plan_list_model)
+    @plan_ns.response(304, 'Not modified since the ETag in If-None-Match')
     def get(self):
         """List all subscription plans with optimized query and caching for first page"""
-        # Clear cache in test mode to avoid test pollution
-        if current_app.config.get('TESTING'):
-            invalidate_plan_list_cache()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')
@@ -186,37 +167,31 @@ class SubscriptionPlanList(Resource):
         should_cache = (page == 1 and per_page in (10, 20))
         cache_key = build_plan_list_cache_key(page, per_page, status, public_only)
         if should_cache:
-            cached = get_cached_plan_list(cache_key)
+            cached = get_cached_plan_payload(cache_key)
             if cached:
-                return cached
+                return make_conditional_response(cached, PLAN_LISTING_HEADERS)
 
-        # Build the optimized query with selective column loading
-        query = SubscriptionPlan.query.options(
-            load_only(
-                SubscriptionPlan.id, SubscriptionPlan.name, SubscriptionPlan.description, 
-                SubscriptionPlan.price, SubscriptionPlan.interval, 
-                SubscriptionPlan.status, SubscriptionPlan.is_public, 
-                SubscriptionPlan.sort_order, SubscriptionPlan.created_at, 
-                SubscriptionPlan.updated_at
-            )
-        )
+        # Core rows carry every column plan_model marshals, without building
+        # mapped instances that are only serialized
+        stmt = select(SubscriptionPlan.__table__)
         if status:
-            query = query.filter(SubscriptionPlan.status == status)
+            stmt = stmt.where(SubscriptionPlan.status == status)
         if public_only:
-            query = query.filter(SubscriptionPlan.is_public == True)
-        pagination = query.order_by(SubscriptionPlan.sort_order).paginate(
-            page=page, per_page=per_page
+            stmt = stmt.where(SubscriptionPlan.is_public == True)
+        items, total, pages = paginate_rows(
+            stmt.order_by(SubscriptionPlan.sort_order), page, per_page
         )
-        result = {
-            'plans': pagination.items,
-            'total': pagination.total,
-            'page': pagination.page,
-            'per_page': pagination.per_page,
-            'pages': pagination.pages
-        }
+        # Cache the serialized page, not rows that outlive their session
+        result = serialize_plan_list({
+            'plans': items,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': pages
+        })
         if should_cache:
-            set_cached_plan_list(cache_key, result)
-        return result
+            set_cached_plan_payload(cache_key, result)
+        return make_conditional_response(result, PLAN_LISTING_HEADERS)
     
     @plan_ns.doc('create_plan')
     @plan_ns.expect(plan_input_model)
@@ -227,19 +202,13 @@ class SubscriptionPlanList(Resource):
         """Create a new subscription plan (admin only)"""
         data = request.json
         
-        features = data.get('features')
-        if features and isinstance(features, dict):
-            features_json = json.dumps(features)
-        else:
-            features_json = features
-            
         plan = SubscriptionPlan(
             name=data['name'],
             description=data['description'],
             price=data['price'],
             interval=data.get('interval', SubscriptionInterval.MONTHLY.value),
             duration_months=data.get('duration_months', 1),
-            features=features_json,
+            features=data.get('features'),
             status=data.get('status', PlanStatus.ACTIVE.value),
             is_public=data.get('is_public', True),
             max_users=data.get('max_users'),
@@ -249,7 +218,7 @@ class SubscriptionPlanList(Resource):
         
         db.session.add(plan)
         db.session.commit()
-        invalidate_plan_list_cache()
+        invalidate_plan_cache()
         return plan, 201
 
 
@@ -304,7 +273,7 @@ class SubscriptionPlanResource(Resource):
                 plan.features = features
         
         db.session.commit()
-        invalidate_plan_list_cache()
+        invalidate_plan_cache()
         return plan
     
     @plan_ns.doc('delete_plan')
@@ -316,7 +285,7 @@ class SubscriptionPlanResource(Resource):
         plan = SubscriptionPlan.query.get_or_404(id)
         db.session.delete(plan)
         db.session.commit()
-        invalidate_plan_list_cache()
+        invalidate_plan_cache()
         return '', 204
 
 
@@ -325,16 +294,10 @@ class SubscriptionIntervals(Resource):
     """Resource for retrieving subscription intervals"""
     
     @plan_ns.doc('get_intervals')
-    @plan_ns.marshal_list_with(interval_model)
+    @plan_ns.response(200, 'Success', [interval_model])
     def get(self):
         """Get all subscription intervals"""
-        intervals = []
-        for interval in SubscriptionInterval:
-            intervals.append({
-                'value': interval.value,
-                'name': interval.name
-            })
-        return intervals
+        return static_json_response(INTERVALS_JSON)
 
 
 @plan_ns.route('/statuses')
@@ -342,16 +305,10 @@ class PlanStatuses(Resource):
     """Resource for retrieving plan statuses"""
     
     @plan_ns.doc('get_plan_statuses')
-    @plan_ns.marshal_list_with(plan_status_model)
+    @plan_ns.response(200, 'Success', [plan_status_model])
     def get(self):
         """Get all subscription plan statuses"""
-        statuses = []
-        for status in PlanStatus:
-            statuses.append({
-                'value': status.value,
-                'name': status.name
-            })
-        return statuses
+        return static_json_response(PLAN_STATUSES_JSON)
 
 
 @subscription_ns.route('/')
@@ -366,7 +323,7 @@ class UserSubscriptionList(Resource):
     @jwt_required()
     def post(self):
         """Create a new subscription"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         data = request.json
         
         plan = SubscriptionPlan.query.options(
@@ -377,14 +334,6 @@ class UserSubscriptionList(Resource):
             SubscriptionPlan.status == PlanStatus.ACTIVE.value
         ).first_or_404('Plan not found or is not active')
         
-        active_subscription = UserSubscription.query.filter(
-            UserSubscription.user_id == user_id,
-            UserSubscription.status == SubscriptionStatus.ACTIVE.value
-        ).first()
-        
-        if active_subscription:
-            return {'message': 'User already has an active subscription'}, 400
-            
         now = datetime.now(UTC)
         trial_days = data.get('trial_days', 0)
         
@@ -407,9 +356,14 @@ class UserSubscriptionList(Resource):
         )
         
         db.session.add(subscription)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # uq_user_subscription_active allows a single active subscription per user
+            db.session.rollback()
+            return {'message': 'User already has an active subscription'}, 400
         
-        invalidate_subscription_cache(user_id)
+        invalidate_active_subscription(user_id)
         
         subscription_with_plan = db.session.get(UserSubscription, subscription.id, options=[
             joinedload(UserSubscription.plan)
@@ -425,35 +379,19 @@ class SubscriptionUpgrade(Resource):
     
     @subscription_ns.doc('upgrade_subscription')
     @subscription_ns.expect(plan_change_model)
-    @subscription_ns.marshal_with(subscription_model)
+    @subscription_ns.response(200, 'Success', subscription_model)
     @subscription_ns.response(400, 'Invalid plan or no active subscription')
     @subscription_ns.response(404, 'Plan not found or no active subscription')
     @jwt_required()
     def post(self):
         """Upgrade or change the active subscription to a different plan"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         data = request.json
         
-        # Get active subscription with optimized JOIN
-        active_subscription = UserSubscription.query.options(
-            joinedload(UserSubscription.plan).load_only(
-                SubscriptionPlan.id, SubscriptionPlan.name, 
-                SubscriptionPlan.price, SubscriptionPlan.duration_months
-            )
-        ).filter(
-            UserSubscription.user_id == user_id,
-            UserSubscription.status == SubscriptionStatus.ACTIVE.value
-        ).first_or_404('No active subscription found')
-        
-        # Get target plan with optimized query
-        new_plan = SubscriptionPlan.query.options(
-            load_only(SubscriptionPlan.id, SubscriptionPlan.name, 
-                     SubscriptionPlan.status, SubscriptionPlan.price, 
-                     SubscriptionPlan.duration_months)
-        ).filter(
-            SubscriptionPlan.id == data['plan_id'],
-            SubscriptionPlan.status == PlanStatus.ACTIVE.value
-        ).first_or_404('Plan not found or is not active')
+        # Get the active subscription and the target plan in a single query
+        active_subscription, new_plan = get_plan_change_or_404(user_id, data['plan_id'])
+        if new_plan.status != PlanStatus.ACTIVE.value:
+            abort(404, 'Plan not found or is not active')
         
         if active_subscription.plan_id == new_plan.id:
             return {'message': 'Already subscribed to this plan'}, 400
@@ -466,17 +404,18 @@ class SubscriptionUpgrade(Resource):
             f"Subscription change: User {user_id} changed from plan {active_subscription.plan_id} to {new_plan.id}"
         )
         
-        active_subscription.plan_id = new_plan.id
-        
         # In a real system, we'd handle proration calculations here
         # For test compatibility, we'll just update the plan ID
+        update_active_subscription(active_subscription, plan_id=new_plan.id, updated_at=now)
+        # Serialize before committing, which would expire the instance
+        result = serialize_subscription(active_subscription)
         
         db.session.commit()
         
-        invalidate_subscription_cache(user_id)
+        invalidate_active_subscription(user_id)
         invalidate_subscription_history_cache(user_id)
         
-        return active_subscription
+        return result
 
 
 @subscription_ns.route('/cancel')
@@ -485,12 +424,12 @@ class SubscriptionCancel(Resource):
     
     @subscription_ns.doc('cancel_subscription')
     @subscription_ns.expect(cancel_subscription_model)
-    @subscription_ns.marshal_with(subscription_model)
+    @subscription_ns.response(200, 'Success', subscription_model)
     @subscription_ns.response(404, 'No active subscription found')
     @jwt_required()
     def post(self):
         """Cancel the current active subscription"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         data = request.json
         at_period_end = data.get('at_period_end', True)
         
@@ -506,20 +445,25 @@ class SubscriptionCancel(Resource):
         
         if at_period_end:
             # Cancel at end of current period
-            subscription.cancel_at_period_end = True
-            subscription.canceled_at = now
+            changes = {'cancel_at_period_end': True, 'canceled_at': now}
         else:
             # Cancel immediately
-            subscription.status = SubscriptionStatus.CANCELED.value
-            subscription.canceled_at = now
-            subscription.end_date = now
-            
+            changes = {
+                'status': SubscriptionStatus.CANCELED.value,
+                'canceled_at': now,
+                'end_date': now
+            }
+        
+        update_active_subscription(subscription, updated_at=now, **changes)
+        # Serialize before committing, which would expire the instance
+        result = serialize_subscription(subscription)
+        
         db.session.commit()
         
-        invalidate_subscription_cache(user_id)
+        invalidate_active_subscription(user_id)
         invalidate_subscription_history_cache(user_id)
         
-        return subscription
+        return result
 
 
 @subscription_ns.route('/active')
@@ -527,33 +471,22 @@ class ActiveSubscription(Resource):
     """Resource for retrieving the active subscription"""
     
     @subscription_ns.doc('get_active_subscription')
-    @subscription_ns.marshal_with(subscription_with_plan_model)
+    @subscription_ns.response(200, 'Success', subscription_with_plan_model)
+    @subscription_ns.response(304, 'Not modified since the ETag in If-None-Match')
     @subscription_ns.response(404, 'No active subscription found')
     @jwt_required()
     def get(self):
         """Get the current active subscription with plan details"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         
-        cached_subscription = get_cached_active_subscription(user_id)
-        if cached_subscription:
-            return cached_subscription
+        cached_subscription = get_cached_active_subscription(user_id, 'v3')
+        if cached_subscription is not None:
+            return make_conditional_response(cached_subscription, PRIVATE_REVALIDATE_HEADERS)
             
-        # If not in cache, get from database with optimized JOIN
-        subscription = UserSubscription.query.options(
-            joinedload(UserSubscription.plan).load_only(
-                SubscriptionPlan.id, SubscriptionPlan.name, 
-                SubscriptionPlan.description, SubscriptionPlan.price,
-                SubscriptionPlan.interval, SubscriptionPlan.features,
-                SubscriptionPlan.status, SubscriptionPlan.duration_months
-            )
-        ).filter(
-            UserSubscription.user_id == user_id,
-            UserSubscription.status == SubscriptionStatus.ACTIVE.value
-        ).first_or_404('No active subscription found')
-        
-        cache_active_subscription(user_id, subscription)
+        subscription = serialize_subscription_with_plan(get_active_subscription_or_404(user_id))
+        set_cached_active_subscription(user_id, 'v3', subscription)
         
-        return subscription
+        return make_conditional_response(subscription, PRIVATE_REVALIDATE_HEADERS)
 
 
 @subscription_ns.route('/history')
@@ -577,7 +510,7 @@ class SubscriptionHistory(Resource):
     @jwt_required()
     def get(self):
         """Get subscription history with optimized JOIN operations and caching for first page"""
-        user_id = get_jwt_identity()
+        user_id = get_current_user_id()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         status = request.args.get('status')
@@ -598,19 +531,14 @@ class SubscriptionHistory(Resource):
             statuses = status.split(',')
             query = query.filter(UserSubscription.status.in_(statuses))
             
-        if from_date:
-            try:
-                from_datetime = datetime.fromisoformat(from_date.replace('Z', '+00:00'))
-                query = query.filter(UserSubscription.start_date >= from_datetime)
-            except ValueError:
-                pass
+        # Invalid dates are ignored; Python 3.11 fromisoformat accepts a trailing Z
+        from_datetime = parse_date_filter(from_date) if from_date else None
+        if from_datetime is not None:
+            query = query.filter(UserSubscription.start_date >= from_datetime)
                 
-        if to_date:
-            try:
-                to_datetime = datetime.fromisoformat(to_date.replace('Z', '+00:00'))
-                query = query.filter(UserSubscription.start_date <= to_datetime)
-            except ValueError:
-                pass
+        to_datetime = parse_date_filter(to_date) if to_date else None
+        if to_datetime is not None:
+            query = query.filter(UserSubscription.start_date <= to_datetime)
                 
         query = query.order_by(UserSubscription.created_at.desc())
         pagination = query.paginate(page=page, per_page=per_page)
@@ -677,7 +605,7 @@ class IndefiniteSubscription(Resource):
         db.session.add(subscription)
         db.session.commit()
         
-        invalidate_subscription_cache(user.id)
+        invalidate_active_subscription(user.id)
         
         subscription_with_plan = UserSubscription.query.options(
             joinedload(UserSubscription.plan)
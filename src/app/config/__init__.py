@@ -0,0 +1,12 @@
+"""
+Configuration package mapping environment names to configuration classes.
+"""
+from app.config.development_config import DevelopmentConfig
+from app.config.production_config import ProductionConfig
+from app.config.testing_config import TestingConfig
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig
+}
@@ -3,6 +3,8 @@ Base configuration module with common settings.
 """
 import os
 
+from app.utils.json_helpers import CustomJSONEncoder
+
 
 class BaseConfig:
     """Base configuration class with common settings."""
@@ -27,14 +29,49 @@ class BaseConfig:
         SQLALCHEMY_DATABASE_URI = f"{DB_ENGINE}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool sized for bursts of concurrent requests. The limit is shared by
+    # every process: workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) must stay below MySQL
+    # max_connections (151 by default), so the defaults fit at most 3 workers; lower
+    # them per worker when running more
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 25))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 25))
+    # Seconds a request waits for a free connection before failing, rather than queueing forever
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # Larger compiled-statement cache so hot queries are compiled once per process
+        "query_cache_size": 1200,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,  # Recycle before the server or a proxy drops idle connections
+    }
 
     # JWT settings
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default-jwt-key-not-for-production")
     JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", 3600))  # 1 hour
     JWT_REFRESH_TOKEN_EXPIRES = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRES", 604800))  # 7 days
+    # Seconds a process may reuse a "token not revoked" lookup. Anything above 0
+    # lets a token logged out on another worker through for that long
+    JWT_NOT_REVOKED_CACHE_TTL = int(os.getenv("JWT_NOT_REVOKED_CACHE_TTL", 0))
+
+    # Response compression (Flask-Compress); bodies below the minimum size are
+    # sent as is, as compressing them costs more than it saves
+    COMPRESS_ALGORITHM = ["br", "gzip"]
+    COMPRESS_LEVEL = 6
+    COMPRESS_MIN_SIZE = 500
+
+    # Hand log records to a background thread instead of writing them in the request
+    LOG_QUEUE_ENABLED = True
 
     # API settings
     API_TITLE = "Subscription Management API"
     API_VERSION = "1.0"
     API_DESCRIPTION = "A RESTful API for managing user subscriptions with optimized SQL queries"
-    API_PREFIX = "/api" 
\ No newline at end of file
+    API_PREFIX = "/api"
+    # Raw SQL rows carry Decimal and datetime values; the encoder converts them
+    # while dumping the response instead of in a separate pass over the payload
+    RESTX_JSON = {"cls": CustomJSONEncoder}
+    # Optional API versions; disabling one skips importing its routes at startup
+    ENABLE_API_V2 = os.getenv("ENABLE_API_V2", "true").lower() == "true"
+    ENABLE_API_V3 = os.getenv("ENABLE_API_V3", "true").lower() == "true"
@@ -10,6 +10,7 @@ class DevelopmentConfig(BaseConfig):
     DEBUG = True
     SQLALCHEMY_ECHO = False  # Log SQL queries
     SQLALCHEMY_RECORD_QUERIES = True  # Enable query recording for Flask-DebugToolbar
+    N_PLUS_ONE_RAISE = True  # Fail requests that trigger N+1 lazy loads
     
     # Override any other settings for development
     DB_NAME = "subscription_dev_db"
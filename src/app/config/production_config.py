@@ -22,6 +22,7 @@ class ProductionConfig(BaseConfig):
     JWT_ERROR_MESSAGE_KEY = "message"
     JWT_BLACKLIST_ENABLED = True  # Enable blacklist in production
     JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]  # Check both token types
+    JWT_NOT_REVOKED_CACHE_TTL = 0  # Logouts must take effect on every worker at once
     JWT_COOKIE_SECURE = True  # Only send cookies over HTTPS
     JWT_COOKIE_CSRF_PROTECT = True  # Enable CSRF protection
     
@@ -32,8 +33,12 @@ class ProductionConfig(BaseConfig):
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
     
-    # Build database URI - default to pymysql dialect
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # Build database URI - default to the mysqlclient (mysqldb) driver, which parses
+    # the protocol and decodes rows in C; DB_DRIVER=pymysql falls back to pure Python
+    DB_DRIVER = os.getenv("DB_DRIVER", "mysqldb")
+    SQLALCHEMY_DATABASE_URI = (
+        f"mysql+{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Production usually doesn't need SQL echo
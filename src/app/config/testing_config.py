@@ -18,6 +18,9 @@ class TestingConfig(BaseConfig):
     # Disable CSRF protection in testing
     WTF_CSRF_ENABLED = False
     
+    # Write log records synchronously, so tests see them as soon as they are emitted
+    LOG_QUEUE_ENABLED = False
+    
     # Use faster hashing for tests
     BCRYPT_LOG_ROUNDS = 4
     
@@ -1,7 +1,9 @@
 """
 Base model with common fields and utility methods.
 """
-from datetime import UTC, datetime
+import operator
+
+from sqlalchemy import func
 
 from app import db
 
@@ -9,12 +11,34 @@ from app import db
 class BaseModel(db.Model):
     """
     Base model class that includes common fields and methods for all models.
+
+    Timestamps are generated by the database, so ``created_at`` and
+    ``updated_at`` are only populated once the row has been flushed; call
+    ``db.session.flush()`` before reading them on a freshly added instance.
     """
     __abstract__ = True
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), nullable=False)
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    @classmethod
+    def _column_getter(cls):
+        """
+        Get the model's column names and a getter reading them all at once.
+        
+        Built on first use and stored on the class itself, so each model
+        walks its table metadata only once.
+        
+        Returns:
+            tuple: (column names, operator.attrgetter over those names)
+        """
+        cached = cls.__dict__.get('_to_dict_columns')
+        if cached is None:
+            names = tuple(column.name for column in cls.__table__.columns)
+            cached = (names, operator.attrgetter(*names))
+            cls._to_dict_columns = cached
+        return cached
 
     def to_dict(self):
         """
@@ -23,5 +47,7 @@ class BaseModel(db.Model):
         Returns:
             dict: Dictionary representation of the model.
         """
-        return {column.name: getattr(self, column.name) 
-                for column in self.__table__.columns} 
\ No newline at end of file
+        # Every model has at least the id and timestamp columns, so the getter
+        # always returns a tuple
+        names, getter = self._column_getter()
+        return dict(zip(names, getter(self))) 
\ No newline at end of file
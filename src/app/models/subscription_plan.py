@@ -11,6 +11,10 @@ from app import db
 
 from .base import BaseModel
 
+# Built once and compact, as features are stored in a TEXT column and sent
+# back verbatim in every plan payload
+_features_encoder = json.JSONEncoder(separators=(',', ':'))
+
 
 class SubscriptionInterval(Enum):
     """Enum for subscription interval types."""
@@ -108,10 +112,7 @@ class SubscriptionPlan(BaseModel):
         self.duration_months = duration_months
         
         # Handle features as either JSON string or dict
-        if isinstance(features, dict):
-            self.features = json.dumps(features)
-        else:
-            self.features = features
+        self.features = self.encode_features(features)
             
         self.status = status
         self.is_public = is_public
@@ -136,14 +137,30 @@ class SubscriptionPlan(BaseModel):
         Get the features as a Python dictionary.
         
         Returns:
-            dict: Dictionary of plan features
+            dict: Dictionary of plan features, which the caller may modify
+        """
+        features = self._parsed_features()
+        return dict(features) if isinstance(features, dict) else features
+    
+    def _parsed_features(self):
         """
-        if not self.features:
+        Parse the features column, reusing the result until the column changes.
+        
+        Returns:
+            dict: Plan features, shared between calls and not to be modified
+        """
+        raw = self.features
+        if not raw:
             return {}
+        cached = self.__dict__.get('_features_parsed')
+        if cached is not None and cached[0] == raw:
+            return cached[1]
         try:
-            return json.loads(self.features)
+            parsed = json.loads(raw)
         except json.JSONDecodeError:
-            return {}
+            parsed = {}
+        self._features_parsed = (raw, parsed)
+        return parsed
     
     def set_features_dict(self, features_dict):
         """
@@ -152,7 +169,22 @@ class SubscriptionPlan(BaseModel):
         Args:
             features_dict (dict): Dictionary of plan features
         """
-        self.features = json.dumps(features_dict)
+        self.features = self.encode_features(features_dict)
+    
+    @staticmethod
+    def encode_features(features):
+        """
+        Encode plan features for the features column.
+        
+        Args:
+            features (str, dict or None): Features as a JSON string or a JSON-compatible value
+            
+        Returns:
+            str: Compact JSON, or the value unchanged if it is already a string or None
+        """
+        if features is None or isinstance(features, str):
+            return features
+        return _features_encoder.encode(features)
     
     def has_feature(self, feature_key):
         """
@@ -164,8 +196,7 @@ class SubscriptionPlan(BaseModel):
         Returns:
             bool: True if feature exists and is enabled
         """
-        features = self.get_features_dict()
-        return features.get(feature_key, False)
+        return self._parsed_features().get(feature_key, False)
     
     def __repr__(self):
         """String representation of the SubscriptionPlan model."""
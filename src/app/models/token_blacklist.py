@@ -1,8 +1,11 @@
 """
 Token blacklist model for handling revoked JWT tokens.
 """
+import time
 from datetime import UTC, datetime
 
+from sqlalchemy import bindparam, literal_column, select
+
 from app import db
 from app.models.base import BaseModel
 
@@ -17,7 +20,7 @@ class TokenBlacklist(BaseModel):
     token_type = db.Column(db.String(10), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     revoked_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(UTC))
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     
     user = db.relationship('User', backref=db.backref('blacklisted_tokens', lazy='dynamic'))
     
@@ -26,17 +29,32 @@ class TokenBlacklist(BaseModel):
         return f'<TokenBlacklist {self.jti}>'
     
     @classmethod
-    def is_token_revoked(cls, jti):
+    def is_token_revoked(cls, jti, not_revoked_ttl=0):
         """
         Check if the given token is blacklisted.
         
         Args:
             jti: The token identifier.
+            not_revoked_ttl: Seconds to trust a "not revoked" answer in this
+                process. Revocations made by other processes are missed for
+                that long, so the default of 0 never caches it.
             
         Returns:
             bool: True if the token is blacklisted, False otherwise.
         """
-        return cls.query.filter_by(jti=jti).first() is not None
+        now = time.time()
+        cached = _revocation_cache.get(jti)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        
+        # Core SELECT on the unique jti index: no ORM entity is loaded
+        revoked = db.session.execute(
+            _REVOKED_STMT,
+            {"jti": jti},
+            execution_options={"compiled_cache": _COMPILED_CACHE}
+        ).first() is not None
+        _remember_revocation(jti, revoked, now, not_revoked_ttl)
+        return revoked
     
     @classmethod
     def add_token_to_blacklist(cls, jti, token_type, user_id, expires_at):
@@ -50,14 +68,80 @@ class TokenBlacklist(BaseModel):
             expires_at: The token expiration date.
             
         Returns:
-            TokenBlacklist: The created token blacklist entry.
+            int: The primary key of the created token blacklist entry.
+
+        Bypasses the ORM unit of work with a Core INSERT whose compiled form
+        is kept in a process-wide cache, since logout only needs the row written.
         """
-        token = cls(
-            jti=jti,
-            token_type=token_type,
-            user_id=user_id,
-            expires_at=expires_at
+        result = db.session.execute(
+            _INSERT_STMT,
+            {
+                "jti": jti,
+                "token_type": token_type,
+                "user_id": user_id,
+                "expires_at": expires_at
+            },
+            execution_options={"compiled_cache": _COMPILED_CACHE}
         )
-        db.session.add(token)
         db.session.commit()
-        return token 
\ No newline at end of file
+        _remember_revocation(jti, True)
+        return result.inserted_primary_key[0]
+    
+    @classmethod
+    def purge_expired_tokens(cls, now=None):
+        """
+        Delete blacklist entries whose tokens have already expired.
+        
+        An expired token is rejected by signature validation anyway, so its
+        row only makes the revocation lookups scan a larger index.
+        
+        Args:
+            now: Reference time, defaults to the current UTC time.
+            
+        Returns:
+            int: The number of entries deleted.
+        """
+        deleted = cls.query.filter(
+            cls.expires_at < (now or datetime.now(UTC))
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+# Process-local memo of blacklist lookups, consulted by the revoked-token check
+# on every authenticated request. A revoked jti stays revoked, so it is kept
+# until evicted; a "not revoked" answer is only kept when the caller opts in
+# with a TTL, since another process may revoke the token meanwhile.
+# In production, this would be replaced with Redis or another distributed cache
+_revocation_cache = {}
+REVOCATION_CACHE_MAX_SIZE = 4096
+
+
+def _remember_revocation(jti, revoked, now=None, not_revoked_ttl=0):
+    """
+    Cache the blacklist status of a token.
+    
+    Args:
+        jti: The token identifier.
+        revoked: Whether the token is blacklisted.
+        now: Current epoch time, defaults to time.time().
+        not_revoked_ttl: Seconds to keep a "not revoked" answer; 0 keeps none.
+    """
+    if not revoked and not_revoked_ttl <= 0:
+        return
+    now = now or time.time()
+    if len(_revocation_cache) >= REVOCATION_CACHE_MAX_SIZE:
+        # Drop stale entries first, and everything if that is not enough
+        for key in [k for k, (_, valid_until) in _revocation_cache.items() if valid_until <= now]:
+            del _revocation_cache[key]
+        if len(_revocation_cache) >= REVOCATION_CACHE_MAX_SIZE:
+            _revocation_cache.clear()
+    _revocation_cache[jti] = (revoked, float('inf') if revoked else now + not_revoked_ttl)
+
+
+# Core statements and their compiled-form cache, shared across calls
+_INSERT_STMT = TokenBlacklist.__table__.insert()
+_REVOKED_STMT = select(literal_column("1")).where(
+    TokenBlacklist.__table__.c.jti == bindparam("jti")
+).limit(1)
+_COMPILED_CACHE = {} 
\ No newline at end of file
@@ -1,12 +1,48 @@
 """
 User model for authentication and user management.
 """
+import functools
+
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app import db
 
 from .base import BaseModel
 
+# Prefix of the hashes built by argon2-cffi; anything else is a werkzeug hash
+_ARGON2_PREFIX = '$argon2'
+
+
+@functools.lru_cache(maxsize=1)
+def _get_password_hasher():
+    """
+    Build the Argon2id password hasher once per process.
+    
+    Returns:
+        PasswordHasher, or None if argon2-cffi is not installed.
+    """
+    try:
+        from argon2 import PasswordHasher
+    except ImportError:
+        return None
+    return PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+
+def hash_password(password):
+    """
+    Hash a password with Argon2id, or werkzeug's default method without argon2-cffi.
+    
+    Args:
+        password (str): Plain text password
+        
+    Returns:
+        str: The encoded hash, which records its own method and parameters
+    """
+    hasher = _get_password_hasher()
+    if hasher is None:
+        return generate_password_hash(password)
+    return hasher.hash(password)
+
 
 class User(BaseModel):
     """
@@ -39,21 +75,95 @@ class User(BaseModel):
         """
         self.username = username
         self.email = email
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
         self.is_admin = is_admin
     
+    @classmethod
+    def create_unless_exists(cls, username, email, password, is_admin=False):
+        """
+        Insert a new user unless the username or email is already taken.
+        
+        The password is hashed before the INSERT so the deliberately slow hash
+        never runs inside the transaction. On MySQL and SQLite the unique
+        indexes skip a duplicate row instead of raising, so a taken name costs
+        no rollback; other databases still raise IntegrityError.
+        
+        Args:
+            username (str): User's username
+            email (str): User's email
+            password (str): User's password (will be hashed)
+            is_admin (bool, optional): Whether the user has admin privileges
+            
+        Returns:
+            User or None: The created user, or None if the username or email exists
+        """
+        result = db.session.execute(_INSERT_IGNORE_STMT, {
+            "username": username,
+            "email": email,
+            "password_hash": hash_password(password),
+            "is_admin": is_admin
+        })
+        db.session.commit()
+        if result.rowcount == 0:
+            return None
+        return db.session.get(cls, result.inserted_primary_key[0])
+    
     def check_password(self, password):
         """
         Verify a password against the stored hash.
         
+        Argon2 hashes are checked with argon2-cffi; older werkzeug hashes
+        are still accepted until password_needs_rehash() upgrades them.
+        
         Args:
             password (str): Password to check
             
         Returns:
             bool: True if password matches, False otherwise
         """
-        return check_password_hash(self.password_hash, password)
+        if not self.password_hash.startswith(_ARGON2_PREFIX):
+            return check_password_hash(self.password_hash, password)
+        hasher = _get_password_hasher()
+        if hasher is None:
+            return False
+        from argon2.exceptions import InvalidHashError, VerificationError
+        try:
+            return hasher.verify(self.password_hash, password)
+        except (InvalidHashError, VerificationError):
+            return False
+    
+    def password_needs_rehash(self):
+        """
+        Check whether the stored hash predates the current hashing parameters.
+        
+        Returns:
+            bool: True if the hash is a werkzeug hash while argon2-cffi is
+                installed, or an Argon2 hash with outdated parameters
+        """
+        hasher = _get_password_hasher()
+        if hasher is None:
+            return False
+        if not self.password_hash.startswith(_ARGON2_PREFIX):
+            return True
+        return hasher.check_needs_rehash(self.password_hash)
+    
+    def set_password(self, password):
+        """
+        Replace the stored hash with a fresh one of the given password.
+        
+        Args:
+            password (str): New plain text password
+        """
+        self.password_hash = hash_password(password)
     
     def __repr__(self):
         """String representation of the User model."""
-        return f"<User {self.username}>" 
\ No newline at end of file
+        return f"<User {self.username}>" 
+
+
+# INSERT that leaves duplicates of the unique username/email to the index
+_INSERT_IGNORE_STMT = (
+    User.__table__.insert()
+    .prefix_with('IGNORE', dialect='mysql')
+    .prefix_with('OR IGNORE', dialect='sqlite')
+)
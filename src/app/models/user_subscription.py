@@ -4,9 +4,9 @@ User subscription model for handling user subscriptions to plans.
 import enum
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import Index, and_, func, or_
+from sqlalchemy import Index, and_, case, func, or_, text
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app import db
 from app.models.base import BaseModel
@@ -41,6 +41,11 @@ class PaymentStatus(enum.Enum):
         return [e.value for e in cls]
 
 
+def _not_postgresql(ddl, target, bind, dialect, **kw):
+    """DDL condition for indexes that PostgreSQL replaces with a partial index."""
+    return dialect.name != 'postgresql'
+
+
 class UserSubscription(BaseModel):
     """
     User Subscription model for managing user subscriptions to plans.
@@ -65,14 +70,16 @@ class UserSubscription(BaseModel):
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     plan_id = db.Column(db.Integer, db.ForeignKey('subscription_plans.id'), nullable=False)
-    status = db.Column(db.String(20), nullable=False, default=SubscriptionStatus.PENDING.value)
-    start_date = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(UTC))
+    status = db.Column(db.Enum(*SubscriptionStatus.values(), name='subscription_status'),
+                       nullable=False, default=SubscriptionStatus.PENDING.value)
+    start_date = db.Column(db.DateTime, nullable=False, server_default=func.now())
     end_date = db.Column(db.DateTime, nullable=True)
     trial_end_date = db.Column(db.DateTime, nullable=True)
     canceled_at = db.Column(db.DateTime, nullable=True)
-    current_period_start = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(UTC))
+    current_period_start = db.Column(db.DateTime, nullable=False, server_default=func.now())
     current_period_end = db.Column(db.DateTime, nullable=True)
-    payment_status = db.Column(db.String(20), nullable=False, default=PaymentStatus.PENDING.value)
+    payment_status = db.Column(db.Enum(*PaymentStatus.values(), name='payment_status'),
+                               nullable=False, default=PaymentStatus.PENDING.value)
     quantity = db.Column(db.Integer, nullable=False, default=1)
     cancel_at_period_end = db.Column(db.Boolean, nullable=False, default=False)
     auto_renew = db.Column(db.Boolean, nullable=False, default=True)
@@ -86,23 +93,49 @@ class UserSubscription(BaseModel):
         # Composite index for active subscriptions by user
         Index('idx_user_subscription_user_status', 'user_id', 'status'),
         
+        # Composite index for a user's subscription history, newest first
+        Index('idx_user_subscription_user_created', 'user_id', 'created_at'),
+        
         # Composite index for expiring subscriptions (useful for renewal reminders)
         Index('idx_user_subscription_status_period_end', 'status', 'current_period_end'),
         
-        # Composite index for expiring trials (useful for notifications)
-        Index('idx_user_subscription_trial_status', 'status', 'trial_end_date'),
-        
-        # Add composite index for user_id and status for efficient lookup of active subscriptions
-        Index('idx_user_subscriptions_user_id_status', 'user_id', 'status'),
+        # Composite index for expiring trials (useful for notifications);
+        # PostgreSQL uses idx_user_subscription_trial_partial instead
+        Index('idx_user_subscription_trial_status', 'status', 'trial_end_date').ddl_if(
+            callable_=_not_postgresql),
         
         # Add composite index for status and end_date for filtering by status and end_date
         Index('idx_user_subscriptions_status_end_date', 'status', 'end_date'),
         
-        # Add composite index for status and current_period_end for filtering by status and current_period_end
-        Index('idx_user_subscriptions_status_current_period_end', 'status', 'current_period_end'),
-        
         # New index for optimizing JOIN operations between UserSubscription and SubscriptionPlan
         Index('idx_user_subscriptions_plan_join', 'user_id', 'plan_id', 'status'),
+        
+        # Partial index covering only active rows for get_active_subscription.
+        # PostgreSQL only: MySQL has no partial indexes and uses idx_user_subscription_user_status
+        Index('idx_user_subscription_active_partial', 'user_id', 'start_date', 'end_date',
+              postgresql_where=text("status = 'active'")).ddl_if(dialect='postgresql'),
+
+        # At most one active subscription per user, enforced by the database so that
+        # concurrent creates cannot race: a partial unique index on PostgreSQL, a
+        # functional unique index elsewhere (non-active rows index NULL, which never clashes)
+        Index('uq_user_subscription_active', 'user_id', unique=True,
+              postgresql_where=text("status = 'active'")).ddl_if(dialect='postgresql'),
+        Index('uq_user_subscription_active_user',
+              text("(CASE WHEN status = 'active' THEN user_id END)"), unique=True).ddl_if(
+            callable_=_not_postgresql),
+
+        # Partial index covering only running trials for expiring-trial notifications
+        Index('idx_user_subscription_trial_partial', 'trial_end_date',
+              postgresql_where=text("status = 'trial' AND trial_end_date IS NOT NULL")
+              ).ddl_if(dialect='postgresql'),
+        
+        # Index shaped after get_expiring_subscriptions: a partial range index on
+        # PostgreSQL, equality-first composite elsewhere
+        Index('idx_user_sub_expiring', 'current_period_end',
+              postgresql_where=text("status = 'active' AND auto_renew = false")
+              ).ddl_if(dialect='postgresql'),
+        Index('idx_user_subscription_expiring', 'status', 'auto_renew', 'current_period_end').ddl_if(
+            callable_=_not_postgresql),
     )
     
     def __init__(self, user_id, plan_id, status=SubscriptionStatus.PENDING.value, 
@@ -118,10 +151,12 @@ class UserSubscription(BaseModel):
             user_id (int): User ID
             plan_id (int): Plan ID
             status (str, optional): Subscription status
-            start_date (datetime, optional): Subscription start date
+            start_date (datetime, optional): Subscription start date, defaults to the
+                database time at insert
             end_date (datetime, optional): Subscription end date
             trial_end_date (datetime, optional): Trial end date
-            current_period_start (datetime, optional): Current billing period start
+            current_period_start (datetime, optional): Current billing period start,
+                defaults to the database time at insert
             current_period_end (datetime, optional): Current billing period end
             payment_status (str, optional): Payment status
             quantity (int, optional): Number of subscriptions
@@ -133,10 +168,10 @@ class UserSubscription(BaseModel):
         self.user_id = user_id
         self.plan_id = plan_id
         self.status = status
-        self.start_date = start_date or datetime.now(UTC)
+        self.start_date = start_date
         self.end_date = end_date
         self.trial_end_date = trial_end_date
-        self.current_period_start = current_period_start or datetime.now(UTC)
+        self.current_period_start = current_period_start
         self.current_period_end = current_period_end
         self.payment_status = payment_status
         self.quantity = quantity
@@ -162,8 +197,9 @@ class UserSubscription(BaseModel):
         if end_date and end_date.tzinfo is None:
             end_date = end_date.replace(tzinfo=UTC)
         
+        # An unflushed subscription without a start date starts at insert time
         return (self.status == SubscriptionStatus.ACTIVE.value and
-                start_date <= now and 
+                (start_date is None or start_date <= now) and 
                 (end_date is None or end_date > now))
     
     @is_active.expression
@@ -233,6 +269,21 @@ class UserSubscription(BaseModel):
         delta = current_period_end - now
         return max(0, delta.days)
     
+    @days_until_renewal.expression
+    def days_until_renewal(cls):
+        """
+        SQLAlchemy expression for days_until_renewal property.
+        
+        Returns:
+            SQLAlchemy expression: Whole days until renewal, NULL if not renewing
+        """
+        return case(
+            (or_(cls.current_period_end == None, cls.auto_renew == False), None),  # noqa: E711,E712
+            else_=func.greatest(
+                0, func.timestampdiff(text('DAY'), func.now(), cls.current_period_end)
+            )
+        )
+    
     def activate(self):
         """Activate the subscription."""
         self.status = SubscriptionStatus.ACTIVE.value
@@ -377,37 +428,19 @@ class UserSubscription(BaseModel):
             UserSubscription: The active subscription or None
         
         Optimized query that:
-            1. Uses the composite index idx_user_active_subscriptions
+            1. Uses the composite index idx_user_subscription_user_status
             2. Eagerly loads the plan relationship to avoid N+1 query problems
-            3. Uses proper date filtering at the database level
+            3. Matches active and still-valid trial subscriptions in a single
+               round-trip, preferring the active one
         """
-        
-        now = datetime.now(UTC)
-        
-        subscription = cls.query.options(
+        return cls.query.options(
             joinedload(cls.plan)  # Eager load plan details
         ).filter(
             cls.user_id == user_id,
-            cls.status == SubscriptionStatus.ACTIVE.value,
-            cls.start_date <= now,
-            or_(
-                cls.end_date.is_(None),
-                cls.end_date > now
-            )
+            or_(cls.is_active, cls.is_trial)
+        ).order_by(
+            case((cls.status == SubscriptionStatus.ACTIVE.value, 0), else_=1)
         ).first()
-        
-        # If not found, try looking for trial subscriptions that are still valid
-        if not subscription:
-            subscription = cls.query.options(
-                joinedload(cls.plan)  # Eager load plan details
-            ).filter(
-                cls.user_id == user_id,
-                cls.status == SubscriptionStatus.TRIAL.value,
-                cls.trial_end_date.isnot(None),
-                cls.trial_end_date > now
-            ).first()
-        
-        return subscription
     
     @classmethod
     def get_expiring_subscriptions(cls, days=7):
@@ -418,10 +451,13 @@ class UserSubscription(BaseModel):
             days (int): Number of days to look ahead
             
         Returns:
-            list: List of expiring subscriptions
+            list: List of expiring subscriptions with plan and user preloaded
         """
         expiry_date = datetime.now(UTC) + timedelta(days=days)
-        return cls.query.filter(
+        return cls.query.options(
+            selectinload(cls.plan),
+            selectinload(cls.user)
+        ).filter(
             cls.status == SubscriptionStatus.ACTIVE.value,
             cls.current_period_end <= expiry_date,
             cls.auto_renew == False  # noqa: E712
@@ -444,14 +480,15 @@ class UserSubscription(BaseModel):
             Pagination: SQLAlchemy pagination object with subscriptions and metadata
             
         Optimization strategies:
-            - Eagerly loads plan details to avoid N+1 query problems
+            - Eagerly loads plan and user details with one IN query each to avoid N+1 query problems
             - Uses composite indexes for efficient querying
             - Provides pagination for handling large result sets
             - Offers flexible filtering by status and date ranges
             - Sorts by most recent first to show newest subscriptions
         """
         query = cls.query.options(
-            joinedload(cls.plan)
+            selectinload(cls.plan),
+            selectinload(cls.user)
         ).filter(
             cls.user_id == user_id
         )
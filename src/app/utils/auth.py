@@ -3,7 +3,24 @@ Authentication utilities and decorators.
 """
 from functools import wraps
 
-from flask_jwt_extended import get_jwt
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from flask_restx import abort
+
+
+def get_current_user_id():
+    """
+    Get the ID of the user owning the current access token.
+    
+    Tokens carry the user ID as a string identity; it is converted once here
+    so queries bind it against integer columns without implicit casts.
+    Must be called after jwt_required() has verified the token.
+    
+    Returns:
+        int: The current user's ID
+    """
+    # get_jwt_identity() only reads the claims jwt_required() already decoded
+    # onto the request, so no extra per-request cache is needed on top of it
+    return int(get_jwt_identity())
 
 
 def admin_required():
@@ -17,11 +34,12 @@ def admin_required():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            claims = get_jwt()
-            is_admin = claims.get('is_admin', False)
-            
-            if not is_admin:
-                return {"message": "Admin privileges required"}, 403
+            # get_jwt() only reads the claims jwt_required() already decoded
+            # onto the request, so a single lookup per call is all it costs
+            if not get_jwt().get('is_admin', False):
+                # Raise instead of returning a body so marshal_with() wrappers
+                # don't marshal the rejection against the resource model
+                abort(403, "Admin privileges required")
                 
             return fn(*args, **kwargs)
         return decorator
@@ -5,6 +5,8 @@ import decimal
 import json
 from datetime import date, datetime
 
+from flask_restx import fields, marshal
+
 
 class CustomJSONEncoder(json.JSONEncoder):
     """
@@ -24,22 +26,83 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super(CustomJSONEncoder, self).default(obj)
 
 
-def convert_decimal_in_dict(obj):
+def compile_serializer(model):
     """
-    Recursively convert Decimal types to float in dictionaries or lists.
+    Build a serializer producing the same output as marshalling with a model.
+    
+    The field lookups, attribute getters and defaults are resolved once here,
+    so serializing an object only calls each field's own format(). This skips
+    the per-object reflection of flask_restx.marshal on large listings.
+    Only scalar, Nested and List-of-Nested fields are supported.
     
     Args:
-        obj: Dictionary, list, or scalar value to process
+        model: Flask-RESTX model (or dict of fields)
         
     Returns:
-        Same structure with Decimal types converted to float
+        callable: Function taking an object and returning a dict
     """
-    if isinstance(obj, dict):
-        return {k: convert_decimal_in_dict(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_decimal_in_dict(item) for item in obj]
-    elif isinstance(obj, decimal.Decimal):
-        return float(obj)
-    elif isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    return obj 
\ No newline at end of file
+    converters = []
+    for key, field in model.items():
+        if isinstance(field, fields.Nested):
+            converters.append((key, _attribute_getter(key, field), _nested_converter(field)))
+        elif isinstance(field, fields.List) and isinstance(field.container, fields.Nested):
+            converters.append((key, _attribute_getter(key, field), _list_converter(field)))
+        elif isinstance(field, fields.Raw) and not isinstance(field, fields.List):
+            converters.append((key, _attribute_getter(key, field), _scalar_converter(field)))
+        else:
+            raise TypeError(f"Unsupported field type for '{key}': {type(field).__name__}")
+    
+    def serialize(obj):
+        return {key: convert(get(obj)) for key, get, convert in converters}
+    
+    return serialize
+
+
+def _attribute_getter(key, field):
+    """Resolve how a field reads its value, as Field.output does."""
+    attribute = key if field.attribute is None else field.attribute
+    if callable(attribute):
+        return attribute
+    
+    def get(obj):
+        if isinstance(obj, dict):
+            return obj.get(attribute)
+        return getattr(obj, attribute, None)
+    return get
+
+
+def _scalar_converter(field):
+    """Format a scalar value, falling back to the field default for None."""
+    def convert(value):
+        if value is None:
+            default = field._v('default')
+            return field.format(default) if default else default
+        return field.format(value)
+    return convert
+
+
+def _nested_converter(field):
+    """Serialize a nested object with its own compiled serializer."""
+    serialize = compile_serializer(field.nested)
+    
+    def convert(value):
+        if value is None:
+            # Rare path: follow Nested.output's rules for missing objects
+            if field.allow_null:
+                return None
+            if field.default is not None:
+                return field.default
+            return marshal(value, field.nested, skip_none=field.skip_none)
+        return serialize(value)
+    return convert
+
+
+def _list_converter(field):
+    """Serialize a list of nested objects, as List.output does."""
+    convert_item = _nested_converter(field.container)
+    
+    def convert(value):
+        if value is None:
+            return field._v('default')
+        return [convert_item(item) for item in value]
+    return convert
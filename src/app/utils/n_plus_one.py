@@ -0,0 +1,64 @@
+"""
+Development guard against N+1 lazy loads, built on SQLAlchemy ORM events.
+"""
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import db
+
+_LOADED_WITH_KEY = 'n_plus_one_loaded_with'
+
+
+class NPlusOneError(Exception):
+    """Raised when a relationship is lazy loaded from a row of a multi-row query."""
+
+
+def _guard_enabled():
+    return has_app_context() and current_app.config.get('N_PLUS_ONE_RAISE', False)
+
+
+def _count_loaded_instance(target, context):
+    """
+    Count the instances of each mapper a query loads, and remember the count on each.
+
+    Every instance of a class loaded by one query shares the same counter, so by
+    the time one of them lazy loads a relationship, the counter holds the number
+    of rows it was loaded with.
+    """
+    if not _guard_enabled():
+        return
+    state = inspect(target)
+    counters = context.attributes.setdefault(_LOADED_WITH_KEY, {})
+    counter = counters.setdefault(state.mapper, [0])
+    counter[0] += 1
+    state.info[_LOADED_WITH_KEY] = counter
+
+
+def _check_lazy_load(orm_execute_state):
+    """Fail a lazy load issued from an instance that a multi-row query returned."""
+    if not orm_execute_state.is_relationship_load or not _guard_enabled():
+        return
+    parent = orm_execute_state.lazy_loaded_from
+    counter = parent.info.get(_LOADED_WITH_KEY) if parent is not None else None
+    if counter and counter[0] > 1:
+        raise NPlusOneError(
+            f"Lazy load of {orm_execute_state.bind_mapper.class_.__name__} from "
+            f"{parent.class_.__name__}, which was loaded with {counter[0] - 1} other rows; "
+            "eager load the relationship in the original query"
+        )
+
+
+def install_n_plus_one_guard():
+    """
+    Make lazy loads that would cause N+1 queries raise NPlusOneError.
+
+    A relationship lazy loaded from an object that came from a multi-row query
+    issues one query per row. Single-row loads (Session.get, .first()) stay
+    allowed. The listeners are process wide, so they are installed once and only
+    act for apps with N_PLUS_ONE_RAISE set.
+    """
+    if event.contains(db.Model, 'load', _count_loaded_instance):
+        return
+    event.listen(db.Model, 'load', _count_loaded_instance, propagate=True)
+    event.listen(Session, 'do_orm_execute', _check_lazy_load)
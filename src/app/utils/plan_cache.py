@@ -0,0 +1,73 @@
+"""
+Process-local cache for subscription plan payloads, shared by all API versions.
+"""
+import time
+from collections import OrderedDict
+
+from app.utils.subscription_cache import clear_active_subscription_cache
+
+# Cache for plan payloads (in-memory implementation)
+# In production, this would be replaced with Redis or another distributed cache
+# Keys come from raw query args (page, per_page, status, cursor), so the cache is
+# bounded and evicts the least recently used payload once it is full
+_plan_cache = OrderedDict()
+PLAN_CACHE_TTL = 300  # 5 minutes in seconds
+PLAN_CACHE_MAX_ENTRIES = 256
+
+
+def get_cached_plan_payload(key):
+    """
+    Get a cached plan payload.
+
+    Args:
+        key (hashable): Cache key, namespaced by the caller
+
+    Returns:
+        The cached payload, or None if it is missing or expired
+    """
+    entry = _plan_cache.get(key)
+    if entry and entry['expires_at'] > time.monotonic():
+        try:
+            _plan_cache.move_to_end(key)
+        except KeyError:
+            pass  # Evicted or invalidated by another thread since the lookup
+        return entry['data']
+    if entry:
+        _plan_cache.pop(key, None)
+    return None
+
+
+def set_cached_plan_payload(key, data):
+    """
+    Cache a plan payload for PLAN_CACHE_TTL seconds.
+
+    Once PLAN_CACHE_MAX_ENTRIES payloads are cached, the least recently used
+    ones are evicted.
+
+    Args:
+        key (hashable): Cache key, namespaced by the caller
+        data: The payload to cache
+    """
+    # Re-inserting moves an existing key to the most recently used end
+    _plan_cache.pop(key, None)
+    _plan_cache[key] = {
+        'data': data,
+        'expires_at': time.monotonic() + PLAN_CACHE_TTL
+    }
+    while len(_plan_cache) > PLAN_CACHE_MAX_ENTRIES:
+        try:
+            _plan_cache.popitem(last=False)
+        except KeyError:
+            break  # Cleared by another thread
+
+
+def invalidate_plan_cache():
+    """
+    Drop every cached plan payload.
+
+    Every API version must call this after writing a plan, as each one may
+    serve plans cached by another. Cached active subscriptions embed their
+    plan, so they are dropped as well.
+    """
+    _plan_cache.clear()
+    clear_active_subscription_cache()
@@ -0,0 +1,62 @@
+"""
+Process-local cache for active subscription payloads, shared by all API versions.
+"""
+import time
+
+# Cache for active subscriptions (in-memory implementation)
+# In production, this would be replaced with Redis or another distributed cache
+_active_subscription_cache = {}
+ACTIVE_SUBSCRIPTION_CACHE_TTL = 120  # 2 minutes in seconds
+
+
+def get_cached_active_subscription(user_id, namespace):
+    """
+    Get a user's cached active subscription payload.
+
+    Args:
+        user_id: ID of the user owning the subscription
+        namespace (str): Caller namespace, as each API version caches its own shape
+
+    Returns:
+        The cached payload, or None if it is missing or expired
+    """
+    entries = _active_subscription_cache.get(str(user_id), {})
+    entry = entries.get(namespace)
+    if entry and entry['expires_at'] > time.monotonic():
+        return entry['data']
+    if entry:
+        entries.pop(namespace, None)
+    return None
+
+
+def set_cached_active_subscription(user_id, namespace, data):
+    """
+    Cache a user's active subscription payload for ACTIVE_SUBSCRIPTION_CACHE_TTL seconds.
+
+    Args:
+        user_id: ID of the user owning the subscription
+        namespace (str): Caller namespace, as each API version caches its own shape
+        data: The serialized subscription, with its plan
+    """
+    _active_subscription_cache.setdefault(str(user_id), {})[namespace] = {
+        'data': data,
+        'expires_at': time.monotonic() + ACTIVE_SUBSCRIPTION_CACHE_TTL
+    }
+
+
+def invalidate_active_subscription(user_id):
+    """
+    Drop every cached active subscription payload of a user.
+
+    Every API version must call this after committing a change to the user's
+    subscriptions, as each one may serve payloads cached by another.
+
+    Args:
+        user_id: ID of the user whose subscriptions changed
+    """
+    _active_subscription_cache.pop(str(user_id), None)
+
+
+def clear_active_subscription_cache():
+    """Drop every cached active subscription payload."""
+    _active_subscription_cache.clear()
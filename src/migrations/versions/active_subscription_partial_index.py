@@ -0,0 +1,31 @@
+"""Add partial index on active user subscriptions
+
+Revision ID: active_subscription_partial_index
+Revises: server_timestamp_defaults
+Create Date: 2024-05-14 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'active_subscription_partial_index'
+down_revision = 'server_timestamp_defaults'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL has no partial indexes; idx_user_subscription_user_status keeps serving the lookup there
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_subscription_active_partial "
+            "ON user_subscriptions (user_id, start_date, end_date) WHERE status = 'active'"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_user_subscription_active_partial")
@@ -0,0 +1,41 @@
+"""Allow at most one active subscription per user with a unique index
+
+Revision ID: active_subscription_unique_index
+Revises: subscription_history_index
+Create Date: 2024-05-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'active_subscription_unique_index'
+down_revision = 'subscription_history_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fails if a user already holds several active subscriptions; cancel the extras first
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_user_subscription_active "
+                "ON user_subscriptions (user_id) WHERE status = 'active'"
+            )
+        return
+    # MySQL 8.0.13+ functional index: non-active rows index NULL, which never clashes
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_user_subscription_active_user',
+            [sa.text("(CASE WHEN status = 'active' THEN user_id END)")],
+            unique=True
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_user_subscription_active")
+        return
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.drop_index('uq_user_subscription_active_user')
@@ -0,0 +1,25 @@
+"""Drop the standalone user_subscriptions end_date index
+
+Revision ID: drop_end_date_index
+Revises: subscription_status_enums
+Create Date: 2024-05-18 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'drop_end_date_index'
+down_revision = 'subscription_status_enums'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        # No query filters on end_date alone; status-qualified lookups use
+        # idx_user_subscriptions_status_end_date
+        batch_op.drop_index('idx_user_subscription_end_date')
+
+
+def downgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.create_index('idx_user_subscription_end_date', ['end_date'], unique=False)
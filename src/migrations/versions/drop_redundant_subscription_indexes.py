@@ -0,0 +1,32 @@
+"""Drop user_subscriptions indexes duplicated by or prefixed by other composites
+
+Revision ID: drop_redundant_subscription_indexes
+Revises: expiring_subscriptions_index
+Create Date: 2024-05-16 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'drop_redundant_subscription_indexes'
+down_revision = 'expiring_subscriptions_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        # Same columns as idx_user_subscription_user_status
+        batch_op.drop_index('idx_user_active_subscriptions')
+        batch_op.drop_index('idx_user_subscriptions_user_id_status')
+        # Leading columns of idx_user_subscriptions_plan_join
+        batch_op.drop_index('idx_user_plan_subscription')
+        # Same columns as idx_user_subscription_status_period_end
+        batch_op.drop_index('idx_user_subscriptions_status_current_period_end')
+
+
+def downgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.create_index('idx_user_subscriptions_status_current_period_end', ['status', 'current_period_end'], unique=False)
+        batch_op.create_index('idx_user_plan_subscription', ['user_id', 'plan_id'], unique=False)
+        batch_op.create_index('idx_user_subscriptions_user_id_status', ['user_id', 'status'], unique=False)
+        batch_op.create_index('idx_user_active_subscriptions', ['user_id', 'status'], unique=False)
@@ -0,0 +1,38 @@
+"""Add index matching the expiring subscriptions query
+
+Revision ID: expiring_subscriptions_index
+Revises: trial_partial_index
+Create Date: 2024-05-15 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'expiring_subscriptions_index'
+down_revision = 'trial_partial_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_sub_expiring "
+                "ON user_subscriptions (current_period_end) "
+                "WHERE status = 'active' AND auto_renew = false"
+            )
+    else:
+        # No partial indexes on MySQL: put the equality columns first so the
+        # current_period_end range is read contiguously
+        with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+            batch_op.create_index('idx_user_subscription_expiring',
+                                  ['status', 'auto_renew', 'current_period_end'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_user_sub_expiring")
+    else:
+        with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+            batch_op.drop_index('idx_user_subscription_expiring')
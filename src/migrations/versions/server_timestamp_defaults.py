@@ -0,0 +1,34 @@
+"""Generate created_at/updated_at defaults on the database side
+
+Revision ID: server_timestamp_defaults
+Revises: init_tables
+Create Date: 2024-05-12 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = 'server_timestamp_defaults'
+down_revision = 'init_tables'
+branch_labels = None
+depends_on = None
+
+TABLES = ('subscription_plans', 'users', 'token_blacklist', 'user_subscriptions')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(),
+                                  existing_nullable=False, server_default=sa.func.now())
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(),
+                                  existing_nullable=False, server_default=sa.func.now())
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(),
+                                  existing_nullable=False, server_default=None)
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(),
+                                  existing_nullable=False, server_default=None)
@@ -0,0 +1,23 @@
+"""Index user_subscriptions on (user_id, created_at) for subscription history
+
+Revision ID: subscription_history_index
+Revises: token_blacklist_expires_at_index
+Create Date: 2024-05-21 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'subscription_history_index'
+down_revision = 'token_blacklist_expires_at_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.create_index('idx_user_subscription_user_created', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_subscription_user_created')
@@ -0,0 +1,30 @@
+"""Generate user_subscriptions start dates on the database side
+
+Revision ID: subscription_start_server_defaults
+Revises: drop_end_date_index
+Create Date: 2024-05-19 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = 'subscription_start_server_defaults'
+down_revision = 'drop_end_date_index'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ('start_date', 'current_period_start')
+
+
+def upgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        for column in COLUMNS:
+            batch_op.alter_column(column, existing_type=sa.DateTime(),
+                                  existing_nullable=False, server_default=sa.func.now())
+
+
+def downgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        for column in COLUMNS:
+            batch_op.alter_column(column, existing_type=sa.DateTime(),
+                                  existing_nullable=False, server_default=None)
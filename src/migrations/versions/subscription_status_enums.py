@@ -0,0 +1,45 @@
+"""Store user_subscriptions status and payment_status as native enums
+
+Revision ID: subscription_status_enums
+Revises: drop_redundant_subscription_indexes
+Create Date: 2024-05-17 00:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = 'subscription_status_enums'
+down_revision = 'drop_redundant_subscription_indexes'
+branch_labels = None
+depends_on = None
+
+SUBSCRIPTION_STATUS = sa.Enum('active', 'canceled', 'expired', 'past_due', 'pending', 'trial', 'changed',
+                              name='subscription_status')
+PAYMENT_STATUS = sa.Enum('paid', 'pending', 'failed', 'refunded', name='payment_status')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # PostgreSQL enums are standalone types that must exist before use
+        SUBSCRIPTION_STATUS.create(bind, checkfirst=True)
+        PAYMENT_STATUS.create(bind, checkfirst=True)
+
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.alter_column('status', existing_type=sa.String(length=20), type_=SUBSCRIPTION_STATUS,
+                              existing_nullable=False, postgresql_using='status::subscription_status')
+        batch_op.alter_column('payment_status', existing_type=sa.String(length=20), type_=PAYMENT_STATUS,
+                              existing_nullable=False, postgresql_using='payment_status::payment_status')
+
+
+def downgrade():
+    with op.batch_alter_table('user_subscriptions', schema=None) as batch_op:
+        batch_op.alter_column('payment_status', existing_type=PAYMENT_STATUS, type_=sa.String(length=20),
+                              existing_nullable=False, postgresql_using='payment_status::text')
+        batch_op.alter_column('status', existing_type=SUBSCRIPTION_STATUS, type_=sa.String(length=20),
+                              existing_nullable=False, postgresql_using='status::text')
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        PAYMENT_STATUS.drop(bind, checkfirst=True)
+        SUBSCRIPTION_STATUS.drop(bind, checkfirst=True)
@@ -0,0 +1,23 @@
+"""Index token_blacklist.expires_at for purging expired entries
+
+Revision ID: token_blacklist_expires_at_index
+Revises: subscription_start_server_defaults
+Create Date: 2024-05-20 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'token_blacklist_expires_at_index'
+down_revision = 'subscription_start_server_defaults'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('token_blacklist', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_token_blacklist_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('token_blacklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blacklist_expires_at'))
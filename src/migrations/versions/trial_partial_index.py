@@ -0,0 +1,37 @@
+"""Replace the trial status index with a partial index on running trials
+
+Revision ID: trial_partial_index
+Revises: active_subscription_partial_index
+Create Date: 2024-05-14 00:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'trial_partial_index'
+down_revision = 'active_subscription_partial_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL has no partial indexes; idx_user_subscription_trial_status stays in place there
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_user_subscription_trial_status")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_subscription_trial_partial "
+            "ON user_subscriptions (trial_end_date) "
+            "WHERE status = 'trial' AND trial_end_date IS NOT NULL"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_user_subscription_trial_partial")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_subscription_trial_status "
+            "ON user_subscriptions (status, trial_end_date)"
+        )
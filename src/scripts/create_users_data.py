@@ -13,9 +13,11 @@ import sys
 from datetime import UTC, datetime, timedelta
 
 from faker import Faker
+from sqlalchemy import select, text
 
 from app import create_app, db
 from app.models import SubscriptionPlan, SubscriptionStatus, User, UserSubscription
+from app.models.user import hash_password
 from app.models.user_subscription import PaymentStatus
 
 fake = Faker()
@@ -27,6 +29,14 @@ EXPIRING_SOON_RATE = 0.2       # 20%
 NEW_USERS_RATE = 0.15          # 15%
 RECENTLY_CANCELED_RATE = 0.1   # 10%
 
+# Faker is slow per call, so names/domains are drawn once into pools and
+# recycled; the running counter suffix keeps usernames unique
+FAKE_POOL_SIZE = 1000
+# Precomputed day offsets used for subscription dates
+DAY_DELTAS = [timedelta(days=days) for days in range(366)]
+# Every demo user shares this password for testing
+DEMO_PASSWORD = "password123"
+
 def calculate_distribution(total_users):
     """Calculate the distribution counts based on total users."""
     users_per_plan = int(total_users * PLAN_DISTRIBUTION_RATE)
@@ -36,6 +46,50 @@ def calculate_distribution(total_users):
     
     return users_per_plan, expiring_soon_count, new_users_count, recently_canceled_count
 
+def set_foreign_key_checks(enabled):
+    """
+    Toggle MySQL foreign key checks on the connection of the current transaction.
+    
+    The seeded subscriptions only reference plans and users that were just
+    read or written, so checking each row against the parent tables during
+    the bulk load is wasted work. Unique checks stay on to protect usernames.
+    
+    Args:
+        enabled (bool): Whether foreign key checks should be enforced
+    """
+    if db.engine.dialect.name != "mysql":
+        return
+    db.session.execute(text(f"SET foreign_key_checks = {1 if enabled else 0}"))
+
+def insert_users(users_table, user_rows):
+    """
+    Insert a batch of users and return their generated IDs in row order.
+    
+    Uses INSERT ... RETURNING when the database can return executemany rows
+    in parameter order (PostgreSQL, SQLite); MySQL has no RETURNING, so the
+    IDs are read back through the unique username index instead.
+    
+    Args:
+        users_table (Table): The users table
+        user_rows (list): Column values for each user
+        
+    Returns:
+        list: The generated user IDs, aligned with user_rows
+    """
+    if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+        return db.session.execute(
+            users_table.insert().returning(users_table.c.id, sort_by_parameter_order=True),
+            user_rows
+        ).scalars().all()
+    
+    db.session.execute(users_table.insert(), user_rows)
+    user_ids = dict(db.session.execute(
+        select(users_table.c.username, users_table.c.id).where(
+            users_table.c.username.in_([row["username"] for row in user_rows])
+        )
+    ).all())
+    return [user_ids[row["username"]] for row in user_rows]
+
 def create_users_data(total_users=DEFAULT_TOTAL_USERS):
     """
     Create users with subscription data based on specified distributions.
@@ -55,8 +109,9 @@ def create_users_data(total_users=DEFAULT_TOTAL_USERS):
         print("Error: Required subscription plans not found. Run create_sample_plans.py first.")
         return
     
-    # Create a plan lookup for easier reference
-    plan_lookup = {plan.name: plan for plan in plans}
+    # Create a plan lookup for easier reference; plain values so committing
+    # a batch doesn't expire and reload the plan objects
+    plan_lookup = {plan.name: {"id": plan.id, "interval": plan.interval} for plan in plans}
     
     # Make sure we have all the required plans
     required_plans = ["Free Plan", "Basic Plan", "Pro Plan", "Basic Plan (Annual)", "Pro Plan (Annual)"]
@@ -66,7 +121,7 @@ def create_users_data(total_users=DEFAULT_TOTAL_USERS):
             return
     
     # Track progress
-    batch_size = min(1000, total_users // 10)  # Adjust batch size for small numbers
+    batch_size = min(10_000, total_users // 10)  # Adjust batch size for small numbers
     if batch_size < 1:
         batch_size = 1
     
@@ -74,6 +129,8 @@ def create_users_data(total_users=DEFAULT_TOTAL_USERS):
     
     # Set up counters for each plan and status type
     plan_counters = {plan_name: 0 for plan_name in required_plans}
+    # Plans still below their distribution target
+    open_plans = [plan_name for plan_name in required_plans if users_per_plan > 0]
     expiring_soon_counter = 0
     new_users_counter = 0
     recently_canceled_counter = 0
@@ -81,60 +138,76 @@ def create_users_data(total_users=DEFAULT_TOTAL_USERS):
     # Current time as reference point
     now = datetime.now(UTC)
     
+    # Fake data pools, generated once instead of per user
+    user_name_pool = [fake.user_name() for _ in range(FAKE_POOL_SIZE)]
+    domain_pool = [fake.domain_name() for _ in range(FAKE_POOL_SIZE)]
+    
+    # Hash the shared demo password once; password hashing is deliberately
+    # slow and would otherwise dominate the run
+    password_hash = hash_password(DEMO_PASSWORD)
+    
+    # Plain table objects for Core bulk inserts (no ORM unit-of-work per row)
+    users_table = User.__table__
+    subscriptions_table = UserSubscription.__table__
+    
     # Create users in batches for better performance
     for batch_num in range(1, (total_users // batch_size) + 1 + (1 if total_users % batch_size > 0 else 0)):
-        user_batch = []
-        subscription_batch = []
+        user_rows = []
+        subscription_rows = []
         
         # For the last batch, adjust size if needed
         current_batch_size = min(batch_size, total_users - total_created)
         
-        for i in range(current_batch_size):
+        for i in range(total_created, total_created + current_batch_size):
             # Generate unique user data
-            username = fake.user_name() + f"_{total_created + i}"
-            email = f"{username}@{fake.domain_name()}"
-            # password = fake.password(length=12)
-            password = "password123" # fix this password for testing
+            username = f"{user_name_pool[i % FAKE_POOL_SIZE]}_{i}"
+            email = f"{username}@{domain_pool[i % FAKE_POOL_SIZE]}"
             
-            # Create user object
-            user = User(
-                username=username,
-                email=email,
-                password=password
-            )
-            user_batch.append(user)
+            user_rows.append({
+                "username": username,
+                "email": email,
+                "password_hash": password_hash,
+                "is_admin": False
+            })
+        
+        set_foreign_key_checks(False)
+        
+        # Add users to database with a single executemany INSERT and collect
+        # the generated IDs in row order
+        user_ids = insert_users(users_table, user_rows)
         
-        # Add users to database in one batch
-        db.session.add_all(user_batch)
-        db.session.flush()  # To get IDs without committing
+        # Draw the random day offsets for the whole batch in one call each
+        start_offsets = random.choices(range(1, 366), k=current_batch_size)
+        new_user_offsets = random.choices(range(0, 8), k=current_batch_size)
+        expiring_offsets = random.choices(range(1, 8), k=current_batch_size)
+        canceled_offsets = random.choices(range(1, 15), k=current_batch_size)
         
         # Now create subscriptions for these users
-        for user in user_batch:
+        for row_index, user_id in enumerate(user_ids):
             # Determine which plan to assign based on distribution targets
-            available_plans = [plan_name for plan_name in required_plans 
-                               if plan_counters[plan_name] < users_per_plan]
-            
-            if not available_plans:
+            if not open_plans:
                 # If we've hit all targets, just use any plan
                 plan_name = random.choice(required_plans)
             else:
-                plan_name = random.choice(available_plans)
+                plan_name = random.choice(open_plans)
                 plan_counters[plan_name] += 1
+                if plan_counters[plan_name] >= users_per_plan:
+                    open_plans.remove(plan_name)
             
             plan = plan_lookup[plan_name]
             
             # Determine subscription status and dates based on distribution requirements
             status = SubscriptionStatus.ACTIVE.value
             payment_status = PaymentStatus.PAID.value
-            start_date = now - timedelta(days=random.randint(1, 365))
+            start_date = now - DAY_DELTAS[start_offsets[row_index]]
             
             # Calculate end date based on plan interval
-            if plan.interval == "monthly":
-                end_date = start_date + timedelta(days=30)
-                current_period_end = start_date + timedelta(days=30)
+            if plan["interval"] == "monthly":
+                end_date = start_date + DAY_DELTAS[30]
+                current_period_end = end_date
             else:  # annual
-                end_date = start_date + timedelta(days=365)
-                current_period_end = start_date + timedelta(days=365)
+                end_date = start_date + DAY_DELTAS[365]
+                current_period_end = end_date
             
             # Adjust for special status categories
             is_expiring_soon = False
@@ -145,48 +218,46 @@ def create_users_data(total_users=DEFAULT_TOTAL_USERS):
             if expiring_soon_counter < expiring_soon_count:
                 # Subscription expiring within 7 days
                 is_expiring_soon = True
-                current_period_end = now + timedelta(days=random.randint(1, 7))
+                current_period_end = now + DAY_DELTAS[expiring_offsets[row_index]]
                 expiring_soon_counter += 1
             elif new_users_counter < new_users_count:
                 # New user (registered within last 7 days)
                 is_new_user = True
-                start_date = now - timedelta(days=random.randint(0, 7))
-                if plan.interval == "monthly":
-                    current_period_end = start_date + timedelta(days=30)
+                start_date = now - DAY_DELTAS[new_user_offsets[row_index]]
+                if plan["interval"] == "monthly":
+                    current_period_end = start_date + DAY_DELTAS[30]
                 else:
-                    current_period_end = start_date + timedelta(days=365)
+                    current_period_end = start_date + DAY_DELTAS[365]
                 new_users_counter += 1
             elif recently_canceled_counter < recently_canceled_count:
                 # Recently canceled subscription
                 is_recently_canceled = True
                 status = SubscriptionStatus.CANCELED.value
-                canceled_at = now - timedelta(days=random.randint(1, 14))
+                canceled_at = now - DAY_DELTAS[canceled_offsets[row_index]]
                 recently_canceled_counter += 1
             
-            # Create subscription
-            subscription = UserSubscription(
-                user_id=user.id,
-                plan_id=plan.id,
-                status=status,
-                start_date=start_date,
-                end_date=end_date if status == SubscriptionStatus.EXPIRED.value else None,
-                current_period_start=start_date,
-                current_period_end=current_period_end,
-                payment_status=payment_status,
-                canceled_at=canceled_at,
-                auto_renew=not is_recently_canceled
-            )
-            
-            subscription_batch.append(subscription)
+            subscription_rows.append({
+                "user_id": user_id,
+                "plan_id": plan["id"],
+                "status": status,
+                "start_date": start_date,
+                "end_date": end_date if status == SubscriptionStatus.EXPIRED.value else None,
+                "current_period_start": start_date,
+                "current_period_end": current_period_end,
+                "payment_status": payment_status,
+                "canceled_at": canceled_at,
+                "auto_renew": not is_recently_canceled
+            })
         
-        # Add subscriptions to database
-        db.session.add_all(subscription_batch)
+        # Add subscriptions to database in one executemany INSERT
+        db.session.execute(subscriptions_table.insert(), subscription_rows)
+        set_foreign_key_checks(True)
         
         # Commit the batch
         db.session.commit()
         
         # Update progress
-        total_created += len(user_batch)
+        total_created += len(user_rows)
         progress = (total_created / total_users) * 100
         print(f"Progress: {progress:.2f}% - Created {total_created} users")
     
@@ -128,6 +128,22 @@ def db_session(app):
         connection.close()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def plan_cache():
+    """
+    Start every test with empty plan and active subscription caches.
+    
+    Tests write plans and subscriptions straight through the session and roll
+    them back, so payloads cached by an earlier test would otherwise leak into
+    later ones.
+    """
+    from app.utils.plan_cache import invalidate_plan_cache
+    
+    invalidate_plan_cache()
+    yield
+    invalidate_plan_cache()
+
+
 @pytest.fixture(scope="function")
 def db(app):
     """
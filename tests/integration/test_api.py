@@ -18,6 +18,7 @@ def test_health_endpoint():
         assert 'status' in data
         assert data['status'] == 'healthy'
         assert data['environment'] == 'testing'
+        assert data['database_connected'] is True
 
 
 def test_api_docs_endpoint():
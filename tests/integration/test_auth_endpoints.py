@@ -4,6 +4,7 @@ Integration tests for authentication endpoints.
 import json
 import pytest
 from sqlalchemy import inspect
+from werkzeug.security import generate_password_hash
 
 from app.models.token_blacklist import TokenBlacklist
 from app.models.user import User
@@ -77,6 +78,44 @@ def test_user_registration_invalid_email(client):
     assert 'Invalid email format' in data['message']
 
 
+def test_user_registration_email_without_domain(client):
+    """Test user registration with an email missing a dotted domain."""
+    user_data = {
+        'username': 'testuser',
+        'email': 'user@localhost',
+        'password': 'password123'
+    }
+    
+    response = client.post(
+        '/api/v1/auth/register',
+        data=json.dumps(user_data),
+        content_type='application/json'
+    )
+    
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'Invalid email format' in data['message']
+
+
+def test_user_registration_username_too_long(client):
+    """Test user registration with a username longer than the column allows."""
+    user_data = {
+        'username': 'u' * 51,
+        'email': 'longname@example.com',
+        'password': 'password123'
+    }
+    
+    response = client.post(
+        '/api/v1/auth/register',
+        data=json.dumps(user_data),
+        content_type='application/json'
+    )
+    
+    assert response.status_code == 400
+    data = json.loads(response.data)
+    assert 'too long' in data['message']
+
+
 def test_user_registration_short_password(client):
     """Test user registration with a password that's too short."""
     user_data = {
@@ -173,6 +212,26 @@ def test_user_login_success_with_username(client, db_session):
     assert data['username'] == 'loginuser'
 
 
+def test_user_login_with_legacy_password_hash(client, db_session):
+    """Test users with a werkzeug hash can log in and are moved to the current hash."""
+    user = User(username='legacyuser', email='legacy@example.com', password='password123')
+    user.password_hash = generate_password_hash('password123', method='pbkdf2:sha256')
+    db_session.add(user)
+    db_session.commit()
+    
+    response = client.post(
+        '/api/v1/auth/login',
+        data=json.dumps({'username': 'legacyuser', 'password': 'password123'}),
+        content_type='application/json'
+    )
+    
+    assert response.status_code == 200
+    # Rehashed with Argon2id at login, or kept as is without argon2-cffi
+    assert user.password_needs_rehash() is False
+    assert user.check_password('password123') is True
+    assert user.check_password('wrongpassword') is False
+
+
 def test_user_login_success_with_email(client, db_session):
     """Test successful user login using email."""
     # Create a test user
@@ -224,6 +283,24 @@ def test_user_login_invalid_credentials(client, db_session):
     assert 'Invalid username/email or password' in data['message']
 
 
+def test_user_login_non_string_username(client):
+    """Test login with a non-string username is rejected as invalid credentials."""
+    login_data = {
+        'username': 12345,
+        'password': 'password123'
+    }
+    
+    response = client.post(
+        '/api/v1/auth/login',
+        data=json.dumps(login_data),
+        content_type='application/json'
+    )
+    
+    assert response.status_code == 401
+    data = json.loads(response.data)
+    assert 'Invalid username/email or password' in data['message']
+
+
 def test_user_login_nonexistent_user(client):
     """Test login with a username that doesn't exist."""
     login_data = {
@@ -114,6 +114,63 @@ def test_create_subscription_plan_without_auth(client, api_version):
     assert response.status_code == 401
 
 
+@pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
+def test_create_subscription_plan_without_admin(client, api_version):
+    """Test creating a subscription plan with a non-admin token."""
+    plan_data = {
+        "name": "Forbidden Plan",
+        "description": "Should not be created",
+        "price": 9.99,
+    }
+    access_token = create_access_token(identity="1")
+
+    response = client.post(
+        f"{api_version}/plans/",
+        data=json.dumps(plan_data),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response.status_code == 403
+    assert json.loads(response.data)["message"] == "Admin privileges required"
+    assert SubscriptionPlan.query.filter_by(name="Forbidden Plan").first() is None
+
+
+def test_create_subscription_plans_bulk(client, db, admin_token):
+    """Test creating several subscription plans in one request."""
+    plans_data = [
+        {"name": "Bulk Plan 1", "description": "First bulk plan", "price": 5.0},
+        {"name": "Bulk Plan 2", "description": "Second bulk plan", "price": 15.0,
+         "interval": SubscriptionInterval.ANNUAL.value, "features": {"seats": 5}},
+    ]
+
+    response = client.post(
+        "/api/v1/plans/bulk",
+        data=json.dumps(plans_data),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+
+    assert response.status_code == 201
+    assert json.loads(response.data)["created"] == 2
+
+    plan = SubscriptionPlan.query.filter_by(name="Bulk Plan 2").first()
+    assert plan is not None
+    assert plan.interval == SubscriptionInterval.ANNUAL.value
+    assert plan.status == PlanStatus.ACTIVE.value
+    assert plan.get_features_dict()["seats"] == 5
+
+    # A plan missing required fields rejects the whole batch
+    response = client.post(
+        "/api/v1/plans/bulk",
+        data=json.dumps([{"name": "Incomplete Plan"}]),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 400
+    assert SubscriptionPlan.query.filter_by(name="Incomplete Plan").first() is None
+
+
 @pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
 def test_update_subscription_plan(client, db, admin_token, api_version):
     """Test updating a subscription plan."""
@@ -152,6 +209,125 @@ def test_update_subscription_plan(client, db, admin_token, api_version):
     assert updated_plan.has_feature("new_feature") is True
 
 
+@pytest.mark.parametrize("write_version", ["/api/v1", "/api/v3"])
+def test_v2_plan_listing_cache_invalidated_by_update(client, db, admin_token, write_version):
+    """Test cached v2 plan listings are dropped when another version updates a plan."""
+    plan = SubscriptionPlan(name="Cached Plan", description="Original description", price=49.99)
+    db.session.add(plan)
+    db.session.commit()
+
+    response = client.get("/api/v2/plans/")
+    assert response.status_code == 200
+    assert [p["name"] for p in json.loads(response.data)["plans"]] == ["Cached Plan"]
+
+    response = client.put(
+        f"{write_version}/plans/{plan.id}",
+        data=json.dumps({"name": "Renamed Plan"}),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v2/plans/")
+    assert [p["name"] for p in json.loads(response.data)["plans"]] == ["Renamed Plan"]
+
+
+def test_partial_update_subscription_plan(client, db, admin_token):
+    """Test that a plan update only changes the fields sent."""
+    plan = SubscriptionPlan(
+        name="Partial Plan", description="Original description", price=49.99, sort_order=3
+    )
+    db.session.add(plan)
+    db.session.commit()
+
+    response = client.put(
+        f"/api/v1/plans/{plan.id}",
+        data=json.dumps({"price": 39.99}),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    data = json.loads(response.data)
+
+    assert response.status_code == 200
+    assert float(data["price"]) == 39.99
+    assert data["name"] == "Partial Plan"
+    assert data["description"] == "Original description"
+    assert data["sort_order"] == 3
+
+    response = client.put(
+        "/api/v1/plans/999999",
+        data=json.dumps({"price": 39.99}),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/plans/", "/plans/intervals"])
+@pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
+def test_plan_listing_etag(client, db, api_version, path):
+    """Test that plan listings answer a matching If-None-Match with 304."""
+    plan = SubscriptionPlan(name="ETag Plan", description="Plan for ETag test", price=9.99)
+    db.session.add(plan)
+    db.session.commit()
+
+    response = client.get(f"{api_version}{path}")
+    assert response.status_code == 200
+    assert "public" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    response = client.get(f"{api_version}{path}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+@pytest.mark.parametrize("path", ["/plans/", "/plans/intervals"])
+@pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
+def test_plan_listing_etag_of_compressed_response(client, db, api_version, path):
+    """Test that the ETag of a compressed listing, which Flask-Compress suffixes with the coding, gets 304."""
+    plan = SubscriptionPlan(name="ETag Plan", description="Plan for ETag test", price=9.99)
+    db.session.add(plan)
+    db.session.commit()
+
+    response = client.get(f"{api_version}{path}")
+    compressed_etag = response.headers["ETag"][:-1] + ':gzip"'
+
+    response = client.get(
+        f"{api_version}{path}",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": compressed_etag},
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_plan_cache_invalidated_by_write(client, db, admin_token):
+    """Test cached plan payloads are dropped when any API version writes a plan."""
+    plan = SubscriptionPlan(name="Cached Plan", description="Before update", price=19.99)
+    db.session.add(plan)
+    db.session.commit()
+
+    response = client.get(f"/api/v1/plans/{plan.id}")
+    assert json.loads(response.data)["description"] == "Before update"
+
+    # A change that bypasses the API is not seen while the payload is cached
+    plan.description = "Changed directly"
+    db.session.commit()
+    response = client.get(f"/api/v1/plans/{plan.id}")
+    assert json.loads(response.data)["description"] == "Before update"
+
+    # Writing through the v3 API invalidates the payload cached by v1
+    response = client.put(
+        f"/api/v3/plans/{plan.id}",
+        data=json.dumps({"description": "After update"}),
+        content_type="application/json",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+
+    response = client.get(f"/api/v1/plans/{plan.id}")
+    assert json.loads(response.data)["description"] == "After update"
+
+
 @pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
 def test_delete_subscription_plan(client, db, admin_token, api_version):
     """Test deleting a subscription plan."""
@@ -274,6 +450,47 @@ def test_pagination(client, db, api_version):
     assert len(data["plans"]) == 5
     assert data["pages"] == 5
 
+    # Pages past the last one are not found
+    response = client.get(f"{api_version}/plans/?page=4")
+    assert response.status_code == 404
+
+
+def test_pagination_cursor(client, db):
+    """Test walking subscription plans with the keyset cursor."""
+    # Plans sharing a sort_order need the id to break the tie
+    plans = []
+    for i in range(1, 8):
+        plan = SubscriptionPlan(
+            name=f"Cursor Plan {i}",
+            description=f"Description for Cursor Plan {i}",
+            price=i * 10.0,
+            sort_order=i % 3,
+        )
+        db.session.add(plan)
+        plans.append(plan)
+    db.session.commit()
+
+    seen_ids = []
+    url = "/api/v1/plans/?per_page=3"
+    for _ in range(len(plans) + 1):
+        response = client.get(url)
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        seen_ids.extend(plan["id"] for plan in data["plans"])
+        if data["next_cursor"] is None:
+            break
+        assert f"cursor={data['next_cursor']}" not in url
+        url = f"/api/v1/plans/?per_page=3&cursor={data['next_cursor']}"
+    else:
+        pytest.fail("Plan cursor did not reach the last page")
+
+    # Cursor pages skip the count query
+    assert data["total"] is None
+    assert seen_ids == [plan.id for plan in sorted(plans, key=lambda plan: (plan.sort_order, plan.id))]
+
+    response = client.get("/api/v1/plans/?cursor=not-a-cursor")
+    assert response.status_code == 400
+
 
 @pytest.fixture
 def admin_token(app):
@@ -74,6 +74,151 @@ def test_create_subscription(client, db, user_token, api_version):
     assert subscription is not None
 
 
+@pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
+def test_create_second_active_subscription(client, db, user_token, api_version):
+    """Test that a user cannot hold two active subscriptions."""
+    plan = SubscriptionPlan(
+        name="Test Plan",
+        description="Test subscription plan",
+        price=19.99
+    )
+    db.session.add(plan)
+    db.session.commit()
+
+    for expected_status in (201, 400):
+        response = client.post(
+            f'{api_version}/subscriptions/',
+            data=json.dumps({"plan_id": plan.id}),
+            content_type='application/json',
+            headers={"Authorization": f"Bearer {user_token['token']}"}
+        )
+        assert response.status_code == expected_status
+
+
+def test_create_indefinite_subscription(client, db, user_token):
+    """Test an admin creating an indefinite subscription for a user."""
+    plan = SubscriptionPlan(
+        name="Lifetime Plan",
+        description="Never expires",
+        price=199.99
+    )
+    admin = User(username="admin", email="admin@example.com", password="adminpass", is_admin=True)
+    db.session.add_all([plan, admin])
+    db.session.commit()
+    admin_token = create_access_token(identity=str(admin.id), additional_claims={"is_admin": True})
+    
+    def create(plan_id, user_id):
+        return client.post(
+            '/api/v1/subscriptions/indefinite',
+            data=json.dumps({"plan_id": plan_id, "user_id": user_id}),
+            content_type='application/json',
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+    
+    assert create(plan.id + 1000, user_token['user_id']).status_code == 404
+    assert create(plan.id, user_token['user_id'] + 1000).status_code == 404
+    
+    response = create(plan.id, user_token['user_id'])
+    data = json.loads(response.data)
+    
+    assert response.status_code == 201
+    assert data['user_id'] == user_token['user_id']
+    assert data['plan_id'] == plan.id
+    assert data['current_period_end'] is None
+
+
+def test_create_indefinite_subscriptions_bulk(client, db, user_token):
+    """Test an admin creating indefinite subscriptions for several users at once."""
+    plan = SubscriptionPlan(
+        name="Lifetime Plan",
+        description="Never expires",
+        price=199.99
+    )
+    admin = User(username="admin", email="admin@example.com", password="adminpass", is_admin=True)
+    other = User(username="other", email="other@example.com", password="password123")
+    db.session.add_all([plan, admin, other])
+    db.session.commit()
+    admin_token = create_access_token(identity=str(admin.id), additional_claims={"is_admin": True})
+    user_ids = [user_token['user_id'], other.id]
+    
+    def create(plan_id, user_ids):
+        return client.post(
+            '/api/v1/subscriptions/indefinite/bulk',
+            data=json.dumps({"plan_id": plan_id, "user_ids": user_ids}),
+            content_type='application/json',
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+    
+    assert create(plan.id, []).status_code == 400
+    assert create(plan.id, [{"id": other.id}]).status_code == 400
+    assert create(plan.id + 1000, user_ids).status_code == 404
+    assert create(plan.id, user_ids + [other.id + 1000]).status_code == 404
+    
+    response = create(plan.id, user_ids)
+    
+    assert response.status_code == 201
+    assert json.loads(response.data) == {'created': 2}
+    assert UserSubscription.query.filter(
+        UserSubscription.user_id.in_(user_ids),
+        UserSubscription.status == SubscriptionStatus.ACTIVE.value,
+        UserSubscription.current_period_end.is_(None)
+    ).count() == 2
+
+
+def test_create_indefinite_subscriptions_bulk_with_active_subscription(client, db, user_token):
+    """Test a bulk create is rejected when one of the users already has an active subscription."""
+    plan = SubscriptionPlan(
+        name="Lifetime Plan",
+        description="Never expires",
+        price=199.99
+    )
+    admin = User(username="admin", email="admin@example.com", password="adminpass", is_admin=True)
+    other = User(username="other", email="other@example.com", password="password123")
+    db.session.add_all([plan, admin, other])
+    db.session.commit()
+    db.session.add(UserSubscription(
+        user_id=user_token['user_id'],
+        plan_id=plan.id,
+        status=SubscriptionStatus.ACTIVE.value,
+        payment_status=PaymentStatus.PAID.value
+    ))
+    db.session.commit()
+    admin_token = create_access_token(identity=str(admin.id), additional_claims={"is_admin": True})
+    
+    response = client.post(
+        '/api/v1/subscriptions/indefinite/bulk',
+        data=json.dumps({"plan_id": plan.id, "user_ids": [other.id, user_token['user_id']]}),
+        content_type='application/json',
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    
+    assert response.status_code == 400
+    assert json.loads(response.data)['message'] == 'A user already has an active subscription'
+
+
+def test_create_trial_subscription(client, db, user_token):
+    """Test creating a subscription with a trial period."""
+    plan = SubscriptionPlan(
+        name="Trial Plan",
+        description="Plan with a trial",
+        price=19.99
+    )
+    db.session.add(plan)
+    db.session.commit()
+    
+    response = client.post(
+        '/api/v1/subscriptions/',
+        data=json.dumps({"plan_id": plan.id, "trial_days": 14}),
+        content_type='application/json',
+        headers={"Authorization": f"Bearer {user_token['token']}"}
+    )
+    data = json.loads(response.data)
+    
+    assert response.status_code == 201
+    assert data['trial_end_date'] is not None
+    assert data['payment_status'] == PaymentStatus.PENDING.value
+
+
 @pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
 def test_upgrade_subscription(client, db, user_token, api_version):
     """Test upgrading/downgrading a subscription."""
@@ -525,6 +670,92 @@ def test_get_subscription_history(client, db, user_token, api_version):
     assert data['pages'] == 3
 
 
+@pytest.mark.parametrize("query", [
+    "from_date=yesterday",
+    "from_date=2024-01-01T00:00:00",
+    "to_date=2024-02-30",
+])
+def test_v2_subscription_history_rejects_invalid_dates(client, db, user_token, query):
+    """Test the v2 history endpoint only accepts YYYY-MM-DD date filters."""
+    response = client.get(
+        f'/api/v2/subscriptions/history?{query}',
+        headers={"Authorization": f"Bearer {user_token['token']}"}
+    )
+    data = json.loads(response.data)
+    
+    assert response.status_code == 400
+    assert 'Use YYYY-MM-DD' in data['message']
+
+
+def test_get_subscription_history_cursor(client, db, user_token):
+    """Test walking subscription history with the keyset cursor."""
+    plan = SubscriptionPlan(
+        name="Cursor Test Plan",
+        description="Plan for testing history cursors",
+        price=9.99
+    )
+    db.session.add(plan)
+    db.session.commit()
+    
+    # Two subscriptions share created_at, so the id has to break the tie
+    created_at = datetime.now(UTC).replace(tzinfo=None, microsecond=0)
+    subscriptions = []
+    for age in (timedelta(0), timedelta(0), timedelta(days=1)):
+        subscription = UserSubscription(
+            user_id=user_token['user_id'],
+            plan_id=plan.id,
+            status=SubscriptionStatus.EXPIRED.value
+        )
+        subscription.created_at = created_at - age
+        subscriptions.append(subscription)
+    db.session.add_all(subscriptions)
+    db.session.commit()
+    
+    # Follow next_cursor until the history is exhausted; a cursor that stops
+    # advancing fails the test instead of looping
+    seen_ids = []
+    seen_cursors = []
+    url = '/api/v1/subscriptions/history?per_page=2'
+    for _ in range(len(subscriptions) + 1):
+        response = client.get(url, headers={"Authorization": f"Bearer {user_token['token']}"})
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert len(data['subscriptions']) <= 2
+        seen_ids += [sub['id'] for sub in data['subscriptions']]
+        if data['next_cursor'] is None:
+            break
+        assert data['next_cursor'] not in seen_cursors
+        seen_cursors.append(data['next_cursor'])
+        url = f"/api/v1/subscriptions/history?per_page=2&cursor={data['next_cursor']}"
+    else:
+        pytest.fail('History cursor did not reach the last page')
+    
+    # Cursor pages skip the count query
+    assert data['total'] is None
+    assert seen_ids == [sub.id for sub in sorted(
+        subscriptions, key=lambda sub: (sub.created_at, sub.id), reverse=True)]
+    
+    response = client.get(
+        '/api/v1/subscriptions/history?per_page=0',
+        headers={"Authorization": f"Bearer {user_token['token']}"}
+    )
+    assert response.status_code == 400
+    
+    response = client.get(
+        '/api/v1/subscriptions/history?cursor=not-a-cursor',
+        headers={"Authorization": f"Bearer {user_token['token']}"}
+    )
+    assert response.status_code == 400
+    
+    # Oversized pages are clamped rather than loading the whole history
+    response = client.get(
+        '/api/v1/subscriptions/history?per_page=100000',
+        headers={"Authorization": f"Bearer {user_token['token']}"}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)['per_page'] == 100
+
+
 @pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
 def test_get_active_subscription(client, db, user_token, api_version):
     """Test getting the user's active subscription."""
@@ -571,6 +802,116 @@ def test_get_active_subscription(client, db, user_token, api_version):
     assert data['plan']['price'] == 19.99
 
 
+@pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
+def test_get_active_subscription_etag(client, db, user_token, api_version):
+    """Test that a matching If-None-Match gets 304 until the subscription changes."""
+    plan = SubscriptionPlan(
+        name="ETag Plan",
+        description="Plan for active subscription ETag test",
+        price=19.99
+    )
+    db.session.add(plan)
+    db.session.commit()
+    
+    now = datetime.now(UTC)
+    subscription = UserSubscription(
+        user_id=user_token['user_id'],
+        plan_id=plan.id,
+        status=SubscriptionStatus.ACTIVE.value,
+        start_date=now - timedelta(days=10),
+        current_period_start=now - timedelta(days=10),
+        current_period_end=now + timedelta(days=20),
+        payment_status=PaymentStatus.PAID.value
+    )
+    db.session.add(subscription)
+    db.session.commit()
+    
+    headers = {"Authorization": f"Bearer {user_token['token']}"}
+    
+    response = client.get(f'{api_version}/subscriptions/active', headers=headers)
+    assert response.status_code == 200
+    assert 'private' in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+    
+    response = client.get(
+        f'{api_version}/subscriptions/active',
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    # Flask-Compress tags compressed responses with the coding appended to the ETag
+    response = client.get(
+        f'{api_version}/subscriptions/active',
+        headers={**headers, "Accept-Encoding": "br", "If-None-Match": etag[:-1] + ':br"'}
+    )
+    assert response.status_code == 304
+    
+    response = client.post(
+        f'{api_version}/subscriptions/cancel',
+        data=json.dumps({"at_period_end": True}),
+        content_type='application/json',
+        headers=headers
+    )
+    assert response.status_code == 200
+    
+    response = client.get(
+        f'{api_version}/subscriptions/active',
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert json.loads(response.data)['cancel_at_period_end'] is True
+
+
+@pytest.mark.parametrize("read_version,write_version", [
+    ("/api/v1", "/api/v3"),
+    ("/api/v3", "/api/v1"),
+    ("/api/v2", "/api/v1"),
+    ("/api/v2", "/api/v3"),
+])
+def test_active_subscription_cache_invalidated_by_cancel(client, db, user_token, read_version, write_version):
+    """Test that canceling through any API version drops the cached active subscription."""
+    plan = SubscriptionPlan(
+        name="Cached Plan",
+        description="Plan for active subscription cache test",
+        price=19.99
+    )
+    db.session.add(plan)
+    db.session.commit()
+    
+    now = datetime.now(UTC)
+    subscription = UserSubscription(
+        user_id=user_token['user_id'],
+        plan_id=plan.id,
+        status=SubscriptionStatus.ACTIVE.value,
+        start_date=now - timedelta(days=10),
+        current_period_start=now - timedelta(days=10),
+        current_period_end=now + timedelta(days=20),
+        payment_status=PaymentStatus.PAID.value
+    )
+    db.session.add(subscription)
+    db.session.commit()
+    
+    headers = {"Authorization": f"Bearer {user_token['token']}"}
+    
+    # Prime the cache
+    response = client.get(f'{read_version}/subscriptions/active', headers=headers)
+    assert response.status_code == 200
+    
+    response = client.post(
+        f'{write_version}/subscriptions/cancel',
+        data=json.dumps({"at_period_end": False}),
+        content_type='application/json',
+        headers=headers
+    )
+    assert response.status_code == 200
+    
+    response = client.get(f'{read_version}/subscriptions/active', headers=headers)
+    assert response.status_code == 404
+
+
 @pytest.mark.parametrize("api_version", ["/api/v1", "/api/v3"])
 def test_get_active_subscription_not_found(client, db, user_token, api_version):
     """Test getting active subscription when user has none."""
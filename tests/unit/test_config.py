@@ -1,7 +1,14 @@
 """
 Test configuration module.
 """
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+from logging.handlers import QueueHandler
+
 import pytest
+from flask_restx.representations import output_json
 
 from app import create_app
 from app.config.development_config import DevelopmentConfig
@@ -29,4 +36,71 @@ def test_production_config():
     """Test production configuration."""
     app = create_app('production')
     assert app.config['DEBUG'] is False
-    assert app.config['TESTING'] is False 
\ No newline at end of file
+    assert app.config['TESTING'] is False 
+
+
+def test_engine_query_cache_size():
+    """Test the compiled-statement cache is sized for the hot hybrid queries."""
+    for config_name in ('development', 'testing', 'production'):
+        app = create_app(config_name)
+        assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['query_cache_size'] == 1200
+
+
+def test_engine_pool_options():
+    """Test the connection pool settings are passed to the engine."""
+    app = create_app('testing')
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    assert options['pool_size'] == TestingConfig.DB_POOL_SIZE
+    assert options['max_overflow'] == TestingConfig.DB_MAX_OVERFLOW
+    assert options['pool_timeout'] == TestingConfig.DB_POOL_TIMEOUT
+    assert options['pool_pre_ping'] is True
+
+
+def test_restx_json_encodes_raw_sql_values():
+    """Test API responses serialize the Decimal and datetime values of raw SQL rows."""
+    app = create_app('testing')
+    with app.test_request_context():
+        response = output_json(
+            {'price': Decimal('19.99'), 'created_at': datetime(2024, 1, 1, 12, 30)}, 200
+        )
+    assert json.loads(response.data) == {'price': 19.99, 'created_at': '2024-01-01T12:30:00'}
+
+
+def test_disabled_api_versions_are_not_registered(monkeypatch):
+    """Test optional API versions can be switched off."""
+    monkeypatch.setattr(TestingConfig, 'ENABLE_API_V2', False)
+    monkeypatch.setattr(TestingConfig, 'ENABLE_API_V3', False)
+    app = create_app('testing')
+    rules = [rule.rule for rule in app.url_map.iter_rules()]
+    assert any(rule.startswith('/api/v1/') for rule in rules)
+    assert not any(rule.startswith(('/api/v2/', '/api/v3/')) for rule in rules)
+
+
+def test_log_queue_handler():
+    """Test app log records are handed to a background thread outside testing."""
+    # Apps share the package logger; pytest's own root handlers keep Flask
+    # from attaching its default one, so provide a handler to move
+    logger = logging.getLogger('app')
+    handler = logging.NullHandler()
+    logger.addHandler(handler)
+    try:
+        app = create_app('production')
+        queue_handlers = app.logger.handlers[:]
+        assert [type(h) for h in queue_handlers] == [QueueHandler]
+        assert queue_handlers[0].listener.handlers == (handler,)
+
+        # Later apps of the same process leave the queue in place
+        create_app('production')
+        assert app.logger.handlers == queue_handlers
+    finally:
+        for queue_handler in logger.handlers[:]:
+            if isinstance(queue_handler, QueueHandler):
+                logger.removeHandler(queue_handler)
+                queue_handler.listener.stop()
+        logger.removeHandler(handler)
+
+
+def test_testing_log_handlers_are_not_queued():
+    """Test log records are written synchronously in testing."""
+    app = create_app('testing')
+    assert not any(isinstance(h, QueueHandler) for h in app.logger.handlers)
@@ -0,0 +1,62 @@
+"""
+Unit tests for the JSON helper functions.
+"""
+import json
+from datetime import UTC, datetime, timedelta
+
+from flask_restx import marshal
+
+from app.api.v1.subscriptions.routes import plan_list_model, subscription_with_plan_model
+from app.models.subscription_plan import SubscriptionPlan
+from app.models.user import User
+from app.models.user_subscription import SubscriptionStatus, UserSubscription
+from app.utils.json_helpers import compile_serializer
+
+
+class TestCompileSerializer:
+    """Tests for compiled model serializers."""
+
+    def test_matches_marshal(self, db):
+        """Test a compiled serializer renders the same JSON as marshal."""
+        user = User(username="serializeuser", email="serialize@example.com", password="password123")
+        plan = SubscriptionPlan(
+            name="Serialize Plan",
+            description="Test plan",
+            price=19.99,
+            features='{"seats": 3}'
+        )
+        db.session.add_all([user, plan])
+        db.session.flush()
+
+        # Leaves several nullable columns unset to exercise field defaults
+        subscription = UserSubscription(
+            user_id=user.id,
+            plan_id=plan.id,
+            status=SubscriptionStatus.ACTIVE.value,
+            current_period_end=datetime.now(UTC) + timedelta(days=30)
+        )
+        db.session.add(subscription)
+        db.session.commit()
+
+        serialize = compile_serializer(subscription_with_plan_model)
+
+        assert json.dumps(serialize(subscription), sort_keys=True) == json.dumps(
+            marshal(subscription, subscription_with_plan_model), sort_keys=True
+        )
+
+    def test_list_matches_marshal(self, db):
+        """Test a compiled serializer renders nested lists from a dict like marshal."""
+        plans = [
+            SubscriptionPlan(name="List Plan A", description="Test plan", price=9.99),
+            SubscriptionPlan(name="List Plan B", description="Test plan", price=19.99, features='{"seats": 5}')
+        ]
+        db.session.add_all(plans)
+        db.session.commit()
+
+        payload = {'plans': plans, 'total': 2, 'page': 1, 'per_page': 10, 'pages': 1, 'next_cursor': None}
+        serialize = compile_serializer(plan_list_model)
+
+        assert json.dumps(serialize(payload), sort_keys=True) == json.dumps(
+            marshal(payload, plan_list_model), sort_keys=True
+        )
+
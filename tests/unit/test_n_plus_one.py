@@ -0,0 +1,60 @@
+"""
+Unit tests for the development N+1 lazy load guard.
+"""
+import pytest
+from sqlalchemy.orm import joinedload
+
+from app.models.subscription_plan import SubscriptionPlan
+from app.models.user import User
+from app.models.user_subscription import UserSubscription
+from app.utils.n_plus_one import NPlusOneError, install_n_plus_one_guard
+
+
+@pytest.fixture
+def subscriber_id(app, db, monkeypatch):
+    """A user with two pending subscriptions to different plans, with the guard enabled."""
+    monkeypatch.setitem(app.config, 'N_PLUS_ONE_RAISE', True)
+    install_n_plus_one_guard()
+
+    user = User(username="guarduser", email="guard@example.com", password="password123")
+    plans = [
+        SubscriptionPlan(name="Guard Plan 1", description="Test plan", price=9.99),
+        SubscriptionPlan(name="Guard Plan 2", description="Test plan", price=19.99),
+    ]
+    db.session.add_all([user, *plans])
+    db.session.flush()
+    db.session.add_all([UserSubscription(user_id=user.id, plan_id=plan.id) for plan in plans])
+    db.session.commit()
+    user_id = user.id
+    db.session.expunge_all()
+    return user_id
+
+
+def test_lazy_load_from_multi_row_query_raises(db, subscriber_id):
+    """Test lazy loading a relationship per row of a list fails."""
+    rows = UserSubscription.query.filter_by(user_id=subscriber_id).all()
+
+    with pytest.raises(NPlusOneError):
+        rows[0].plan
+
+
+def test_single_row_and_eager_loads_are_allowed(db, subscriber_id):
+    """Test lazy loads from single-row queries and eager loaded lists still work."""
+    subscription = UserSubscription.query.filter_by(user_id=subscriber_id).first()
+    assert subscription.plan.name.startswith("Guard Plan")
+
+    db.session.expunge_all()
+    rows = (
+        UserSubscription.query.options(joinedload(UserSubscription.plan))
+        .filter_by(user_id=subscriber_id)
+        .all()
+    )
+    assert sorted(row.plan.name for row in rows) == ["Guard Plan 1", "Guard Plan 2"]
+
+
+def test_guard_is_off_without_config(app, db, subscriber_id, monkeypatch):
+    """Test apps without N_PLUS_ONE_RAISE are unaffected by the installed guard."""
+    monkeypatch.setitem(app.config, 'N_PLUS_ONE_RAISE', False)
+    rows = UserSubscription.query.filter_by(user_id=subscriber_id).all()
+
+    assert rows[0].plan.name.startswith("Guard Plan")
@@ -0,0 +1,23 @@
+"""
+Unit tests for the plan payload cache.
+"""
+from app.utils import plan_cache
+from app.utils.plan_cache import get_cached_plan_payload, set_cached_plan_payload
+
+
+def test_plan_cache_evicts_least_recently_used(monkeypatch):
+    """Test the cache stays within PLAN_CACHE_MAX_ENTRIES however many keys clients send."""
+    monkeypatch.setattr(plan_cache, 'PLAN_CACHE_MAX_ENTRIES', 3)
+    for page in range(1, 4):
+        set_cached_plan_payload(('v1-list', page), {'page': page})
+
+    # Reading page 1 makes page 2 the least recently used entry
+    assert get_cached_plan_payload(('v1-list', 1)) == {'page': 1}
+    for page in range(4, 100):
+        set_cached_plan_payload(('v1-list', page), {'page': page})
+        get_cached_plan_payload(('v1-list', 1))
+
+    assert len(plan_cache._plan_cache) == 3
+    assert get_cached_plan_payload(('v1-list', 1)) == {'page': 1}
+    assert get_cached_plan_payload(('v1-list', 2)) is None
+    assert get_cached_plan_payload(('v1-list', 99)) == {'page': 99}
@@ -237,11 +237,16 @@ class TestSqlOptimizations:
     def test_get_expiring_subscriptions(self, app):
         """Test get_expiring_subscriptions() function."""
         with app.app_context():
-            # Create a test user
-            user = User(
-                username="testuser3", email="test3@example.com", password="password"
-            )
-            db.session.add(user)
+            # Create test users; each may hold only one active subscription
+            users = [
+                User(
+                    username=f"testuser3{suffix}",
+                    email=f"test3{suffix}@example.com",
+                    password="password",
+                )
+                for suffix in ("a", "b", "c")
+            ]
+            db.session.add_all(users)
             db.session.commit()
 
             # Create a test plan
@@ -261,7 +266,7 @@ class TestSqlOptimizations:
             subscriptions = [
                 # Expires in 5 days, auto_renew=False (should be included)
                 UserSubscription(
-                    user_id=user.id,
+                    user_id=users[0].id,
                     plan_id=plan.id,
                     status=SubscriptionStatus.ACTIVE.value,
                     start_date=datetime.now(UTC) - timedelta(days=25),
@@ -272,7 +277,7 @@ class TestSqlOptimizations:
                 ),
                 # Expires in 5 days, but auto_renew=True (should not be included)
                 UserSubscription(
-                    user_id=user.id,
+                    user_id=users[1].id,
                     plan_id=plan.id,
                     status=SubscriptionStatus.ACTIVE.value,
                     start_date=datetime.now(UTC) - timedelta(days=25),
@@ -283,7 +288,7 @@ class TestSqlOptimizations:
                 ),
                 # Expires in 10 days, auto_renew=False (should be included with days=10)
                 UserSubscription(
-                    user_id=user.id,
+                    user_id=users[2].id,
                     plan_id=plan.id,
                     status=SubscriptionStatus.ACTIVE.value,
                     start_date=datetime.now(UTC) - timedelta(days=20),
@@ -317,7 +322,9 @@ class TestSqlOptimizations:
             
             # Create a test user
             user = User(username="testuser4", email="test4@example.com", password="password")
-            db.session.add(user)
+            # A user may hold only one active subscription
+            other_user = User(username="testuser4b", email="test4b@example.com", password="password")
+            db.session.add_all([user, other_user])
             db.session.commit()
             
             # Create a test plan
@@ -349,7 +356,7 @@ class TestSqlOptimizations:
                 ),
                 # Active subscription 2 (also expiring soon, but without auto-renew)
                 UserSubscription(
-                    user_id=user.id,
+                    user_id=other_user.id,
                     plan_id=plan.id,
                     status=SubscriptionStatus.ACTIVE.value,
                     start_date=now - timedelta(days=25),
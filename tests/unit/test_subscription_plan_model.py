@@ -137,6 +137,29 @@ def test_subscription_plan_has_feature(db):
     assert plan.has_feature("custom_domain") is False
     assert plan.has_feature("nonexistent_feature") is False
 
+
+def test_subscription_plan_features_follow_updates(db):
+    """Test parsed features are reused, yet follow changes to the column."""
+    plan = SubscriptionPlan(
+        name="Changing Features Plan",
+        description="Test features",
+        price=19.99,
+        features={"seats": 5}
+    )
+    
+    # Callers get their own copy to modify
+    features = plan.get_features_dict()
+    features["seats"] = 50
+    assert plan.get_features_dict() == {"seats": 5}
+    
+    plan.set_features_dict({"seats": 10, "sso": True})
+    assert plan.get_features_dict() == {"seats": 10, "sso": True}
+    assert plan.has_feature("sso") is True
+    
+    plan.features = None
+    assert plan.get_features_dict() == {}
+    assert plan.has_feature("sso") is False
+
 def test_subscription_plan_unique_name_per_interval(db):
     """Test that plan names must be unique within an interval."""
     plan1 = SubscriptionPlan(
@@ -168,4 +191,23 @@ def test_subscription_plan_unique_name_per_interval(db):
     db.session.add(plan3)
     
     with pytest.raises(Exception):  # Should raise an integrity error
-        db.session.commit() 
\ No newline at end of file
+        db.session.commit() 
+def test_encode_features():
+    """Test encoding plan features for storage."""
+    assert SubscriptionPlan.encode_features({"seats": 5, "sso": True}) == '{"seats":5,"sso":true}'
+    assert SubscriptionPlan.encode_features('{"seats": 5}') == '{"seats": 5}'
+    assert SubscriptionPlan.encode_features(None) is None
+
+
+def test_subscription_plan_to_dict(db):
+    """Test to_dict returns every column of the model."""
+    plan = SubscriptionPlan(name="Dict Plan", description="Test plan", price=19.99)
+    db.session.add(plan)
+    db.session.commit()
+    
+    data = plan.to_dict()
+    
+    assert set(data) == {column.name for column in SubscriptionPlan.__table__.columns}
+    assert data["id"] == plan.id
+    assert data["name"] == "Dict Plan"
+    assert data["created_at"] is not None
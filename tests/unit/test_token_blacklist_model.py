@@ -0,0 +1,67 @@
+"""
+Unit tests for the TokenBlacklist model.
+"""
+from datetime import UTC, datetime, timedelta
+
+from app.models.token_blacklist import TokenBlacklist
+from app.models.user import User
+
+
+class TestTokenBlacklistModel:
+    """Tests for TokenBlacklist model and its methods."""
+
+    def test_purge_expired_tokens(self, db):
+        """Test only expired entries are purged from the blacklist."""
+        user = User(username="purgeuser", email="purge@example.com", password="password123")
+        db.session.add(user)
+        db.session.commit()
+
+        now = datetime.now(UTC)
+        TokenBlacklist.add_token_to_blacklist(
+            jti="expired-jti", token_type="access", user_id=user.id,
+            expires_at=now - timedelta(hours=1)
+        )
+        TokenBlacklist.add_token_to_blacklist(
+            jti="live-jti", token_type="access", user_id=user.id,
+            expires_at=now + timedelta(hours=1)
+        )
+
+        assert TokenBlacklist.purge_expired_tokens(now=now) == 1
+        assert TokenBlacklist.query.filter_by(jti="expired-jti").first() is None
+        assert TokenBlacklist.query.filter_by(jti="live-jti").first() is not None
+
+    def test_is_token_revoked_cache(self, db):
+        """Test revocations are answered from the process-local cache."""
+        user = User(username="cacheuser", email="cache@example.com", password="password123")
+        db.session.add(user)
+        db.session.commit()
+
+        assert TokenBlacklist.is_token_revoked("cached-jti", not_revoked_ttl=60) is False
+
+        TokenBlacklist.add_token_to_blacklist(
+            jti="cached-jti", token_type="access", user_id=user.id,
+            expires_at=datetime.now(UTC) + timedelta(hours=1)
+        )
+        # Revoking in this process replaces the cached "not revoked" answer
+        assert TokenBlacklist.is_token_revoked("cached-jti") is True
+
+        # A revoked token stays revoked without going back to the database
+        TokenBlacklist.query.filter_by(jti="cached-jti").delete()
+        db.session.commit()
+        assert TokenBlacklist.is_token_revoked("cached-jti") is True
+
+    def test_is_token_revoked_not_cached_by_default(self, db):
+        """Test a "not revoked" answer is not reused unless a TTL is given."""
+        user = User(username="otherworker", email="other@example.com", password="password123")
+        db.session.add(user)
+        db.session.commit()
+
+        assert TokenBlacklist.is_token_revoked("other-jti") is False
+
+        # Simulate another process revoking the token without this cache knowing
+        db.session.add(TokenBlacklist(
+            jti="other-jti", token_type="access", user_id=user.id,
+            expires_at=datetime.now(UTC) + timedelta(hours=1)
+        ))
+        db.session.commit()
+        assert TokenBlacklist.is_token_revoked("other-jti") is True
@@ -225,6 +225,94 @@ class TestUserSubscriptionModel:
         assert subscription.plan_id == plan2.id
         assert subscription.status == SubscriptionStatus.ACTIVE.value
 
+    def test_get_active_subscription(self, db):
+        """Test active subscription lookup falls back to a valid trial."""
+        # Create test user and plan
+        user = User(username="lookupuser", email="lookup@example.com", password="password123")
+        plan = SubscriptionPlan(name="Lookup Plan", description="Test plan", price=19.99)
+        db.session.add_all([user, plan])
+        db.session.flush()
+        
+        # Only a running trial exists
+        trial_sub = UserSubscription(
+            user_id=user.id,
+            plan_id=plan.id,
+            status=SubscriptionStatus.TRIAL.value,
+            start_date=datetime.now(UTC) - timedelta(days=1),
+            trial_end_date=datetime.now(UTC) + timedelta(days=7)
+        )
+        db.session.add(trial_sub)
+        db.session.commit()
+        
+        assert UserSubscription.get_active_subscription(user.id).id == trial_sub.id
+        
+        # An active subscription takes precedence over the trial
+        active_sub = UserSubscription(
+            user_id=user.id,
+            plan_id=plan.id,
+            status=SubscriptionStatus.ACTIVE.value,
+            start_date=datetime.now(UTC) - timedelta(days=1)
+        )
+        db.session.add(active_sub)
+        db.session.commit()
+        
+        subscription = UserSubscription.get_active_subscription(user.id)
+        assert subscription.id == active_sub.id
+        assert subscription.plan.id == plan.id
+
+    def test_days_until_renewal_expression(self, db):
+        """Test the days_until_renewal SQL expression matches the Python property."""
+        # A user may hold only one active subscription
+        users = [
+            User(username=f"renewaluser{i}", email=f"renewal{i}@example.com", password="password123")
+            for i in range(3)
+        ]
+        plan = SubscriptionPlan(name="Renewal Plan", description="Test plan", price=19.99)
+        db.session.add_all([*users, plan])
+        db.session.flush()
+        
+        # Period ends are kept half a day away from a day boundary
+        now = datetime.now(UTC)
+        renewing = UserSubscription(
+            user_id=users[0].id,
+            plan_id=plan.id,
+            status=SubscriptionStatus.ACTIVE.value,
+            current_period_end=now + timedelta(days=10, hours=12)
+        )
+        lapsed = UserSubscription(
+            user_id=users[1].id,
+            plan_id=plan.id,
+            status=SubscriptionStatus.ACTIVE.value,
+            current_period_end=now - timedelta(days=2, hours=12)
+        )
+        not_renewing = UserSubscription(
+            user_id=users[2].id,
+            plan_id=plan.id,
+            status=SubscriptionStatus.ACTIVE.value,
+            current_period_end=now + timedelta(days=3, hours=12),
+            auto_renew=False
+        )
+        db.session.add_all([renewing, lapsed, not_renewing])
+        db.session.commit()
+        
+        subscriptions = [renewing, lapsed, not_renewing]
+        rows = dict(db.session.query(
+            UserSubscription.id, UserSubscription.days_until_renewal
+        ).filter(UserSubscription.id.in_([sub.id for sub in subscriptions])).all())
+        
+        for subscription in subscriptions:
+            assert rows[subscription.id] == subscription.days_until_renewal
+        assert rows[renewing.id] == 10
+        assert rows[lapsed.id] == 0
+        assert rows[not_renewing.id] is None
+        
+        # The expression can filter and order like a column
+        renewing_soon = UserSubscription.query.filter(
+            UserSubscription.id.in_([sub.id for sub in subscriptions]),
+            UserSubscription.days_until_renewal >= 0
+        ).order_by(UserSubscription.days_until_renewal.desc()).all()
+        assert [sub.id for sub in renewing_soon] == [renewing.id, lapsed.id]
+
     def test_get_user_subscription_history(self, db):
         """Test retrieving user subscription history."""
         # Create test user and plans